@@ -10,8 +10,10 @@ Usage:
 """
 
 import argparse
+import json
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Add src to path
@@ -20,32 +22,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 from config_loader import load_yaml_config, get_aws_config
 
 
-def generate_samconfig(config_path: str = None):
-    """Generate samconfig.toml from config.yaml."""
-    cfg = load_yaml_config(config_path)
-    aws_cfg = cfg.get("aws", {})
-
-    region = aws_cfg.get("region", "eu-central-1")
-    stack_name = aws_cfg.get("stack_name", "tuya-power-monitor")
-    table_name = aws_cfg.get("table_name", "power_watch_state")
-
-    # Build parameter overrides - use single quotes inside, double quotes for TOML string
-    params = [
-        f"TuyaEndpoint='{cfg['tuya']['endpoint']}'",
-        f"TuyaAccessId='{cfg['tuya']['access_id']}'",
-        f"TuyaAccessKey='{cfg['tuya']['access_key']}'",
-        f"TuyaDeviceId='{cfg['tuya']['device_id']}'",
-        f"TelegramBotToken='{cfg['telegram']['bot_token']}'",
-        f"TelegramChatId='{cfg['telegram']['chat_id']}'",
-        f"DebounceCount='{cfg.get('settings', {}).get('debounce_count', 2)}'",
-        f"ConfirmationDelayMinutes='{cfg.get('settings', {}).get('confirmation_delay_minutes', 3)}'",
-        f"Timezone='{cfg.get('settings', {}).get('timezone', 'Europe/Kyiv')}'",
-        f"TableName='{table_name}'",
-    ]
-
-    param_overrides = " ".join(params)
-
-    samconfig = f'''# Auto-generated from config.yaml
+_SAMCONFIG_TEMPLATE = """# Auto-generated from config.yaml
 # Run: python scripts/deploy.py --init
 
 version = 0.1
@@ -66,14 +43,42 @@ cached = true
 
 [default.local_invoke.parameters]
 env_vars = "env.json"
-'''
+"""
 
-    return samconfig
+
+def generate_samconfig(config_path: str = None):
+    """Generate samconfig.toml from config.yaml."""
+    cfg = load_yaml_config(config_path)
+    aws_cfg = cfg.get("aws", {})
+    settings = cfg.get("settings", {})
+
+    params = {
+        "TuyaEndpoint": cfg["tuya"]["endpoint"],
+        "TuyaAccessId": cfg["tuya"]["access_id"],
+        "TuyaAccessKey": cfg["tuya"]["access_key"],
+        "TuyaDeviceId": cfg["tuya"]["device_id"],
+        "TelegramBotToken": cfg["telegram"]["bot_token"],
+        "TelegramChatId": cfg["telegram"]["chat_id"],
+        "DebounceCount": settings.get("debounce_count", 2),
+        "ConfirmationDelayMinutes": settings.get("confirmation_delay_minutes", 3),
+        "Timezone": settings.get("timezone", "Europe/Kyiv"),
+        "TableName": aws_cfg.get("table_name", "power_watch_state"),
+    }
+
+    # Build parameter overrides - use single quotes inside, double quotes for TOML string
+    param_overrides = " ".join(f"{name}='{value}'" for name, value in params.items())
+
+    return _SAMCONFIG_TEMPLATE.format(
+        stack_name=aws_cfg.get("stack_name", "tuya-power-monitor"),
+        region=aws_cfg.get("region", "eu-central-1"),
+        param_overrides=param_overrides,
+    )
 
 
 def create_env_json(config_path: str = None):
     """Create env.json for SAM local invoke."""
     cfg = load_yaml_config(config_path)
+    settings = cfg.get("settings", {})
 
     env_vars = {
         "PowerMonitorFunction": {
@@ -84,17 +89,21 @@ def create_env_json(config_path: str = None):
             "TG_BOT_TOKEN": cfg["telegram"]["bot_token"],
             "TG_CHAT_ID": str(cfg["telegram"]["chat_id"]),
             "DDB_TABLE": cfg.get("aws", {}).get("table_name", "power_watch_state"),
-            "DEBOUNCE_COUNT": str(cfg.get("settings", {}).get("debounce_count", 2)),
-            "CONFIRMATION_DELAY_MINUTES": str(
-                cfg.get("settings", {}).get("confirmation_delay_minutes", 3)
-            ),
-            "TIMEZONE": cfg.get("settings", {}).get("timezone", "Europe/Kyiv"),
+            "DEBOUNCE_COUNT": str(settings.get("debounce_count", 2)),
+            "CONFIRMATION_DELAY_MINUTES": str(settings.get("confirmation_delay_minutes", 3)),
+            "TIMEZONE": settings.get("timezone", "Europe/Kyiv"),
         }
     }
 
-    import json
+    return json.dumps(env_vars, separators=(",", ":"))
+
 
-    return json.dumps(env_vars, indent=2)
+def write_file(path: Path, render, config_path: str = None) -> Path:
+    """Render content from config.yaml and write it to path."""
+    content = render(config_path)
+    with open(path, "w") as f:
+        f.write(content)
+    return path
 
 
 def main():
@@ -129,21 +138,20 @@ def main():
             return
 
         if args.init:
-            # Generate samconfig.toml
-            samconfig_content = generate_samconfig(args.config)
             samconfig_path = project_root / "samconfig.toml"
-
-            with open(samconfig_path, "w") as f:
-                f.write(samconfig_content)
-            print(f"✅ Created {samconfig_path}")
-
-            # Generate env.json for local testing
-            env_json_content = create_env_json(args.config)
             env_json_path = project_root / "env.json"
 
-            with open(env_json_path, "w") as f:
-                f.write(env_json_content)
-            print(f"✅ Created {env_json_path}")
+            # Parse config.yaml once up front; both renders then hit the loader cache
+            load_yaml_config(args.config)
+
+            # Render and write samconfig.toml and env.json (for local testing) side by side
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                futures = [
+                    executor.submit(write_file, samconfig_path, generate_samconfig, args.config),
+                    executor.submit(write_file, env_json_path, create_env_json, args.config),
+                ]
+                for future in futures:
+                    print(f"✅ Created {future.result()}")
 
             print()
             print("Next steps:")
@@ -6,22 +6,58 @@ Checks that Python code is properly formatted before committing.
 Install with: invoke install-hooks
 """
 
+import os
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from fnmatch import fnmatch
+
+# Generated code we never format or lint
+SKIP_PATTERNS = ("*_pb2.py", "*_pb2_grpc.py", "migrations/*", "*/migrations/*")
+
+# Files larger than this are almost certainly generated or vendored
+MAX_FILE_SIZE = 1024 * 1024
+
+
+def should_check(path: str, added: str, deleted: str) -> bool:
+    """Decide whether a staged Python file needs ruff, based on its numstat entry and path."""
+    # No line changes (e.g. mode-only change) - nothing new for ruff to see
+    if added == "0" and deleted == "0":
+        return False
+    if any(fnmatch(path, pattern) for pattern in SKIP_PATTERNS):
+        return False
+    try:
+        return os.path.getsize(path) <= MAX_FILE_SIZE
+    except OSError:
+        return False
 
 
 def main():
     """Run pre-commit checks."""
     print("🔍 Running pre-commit checks...")
 
-    # Get list of staged Python files
+    # Get staged files with their line counts as NUL-separated "added<TAB>deleted<TAB>path"
+    # records; -z keeps paths unquoted and we only decode the .py ones
     result = subprocess.run(
-        ["git", "diff", "--cached", "--name-only", "--diff-filter=ACM"],
+        ["git", "diff", "--cached", "--numstat", "--diff-filter=ACM", "-z"],
         capture_output=True,
-        text=True,
     )
 
-    staged_files = [f for f in result.stdout.strip().split("\n") if f.endswith(".py") and f]
+    staged_files = []
+    records = iter(result.stdout.split(b"\0"))
+    for record in records:
+        if not record:
+            continue
+        added, deleted, path = record.split(b"\t", 2)
+        if not path:
+            # Copies are written as "added<TAB>deleted<TAB>\0<source>\0<destination>"
+            next(records, None)
+            path = next(records, b"")
+        if not path.endswith(b".py"):
+            continue
+        path = os.fsdecode(path)
+        if should_check(path, added.decode(), deleted.decode()):
+            staged_files.append(path)
 
     if not staged_files:
         print("✅ No Python files to check")
@@ -29,12 +65,22 @@ def main():
 
     print(f"   Checking {len(staged_files)} Python file(s)...")
 
-    # Check formatting with ruff
-    format_result = subprocess.run(
-        ["ruff", "format", "--check"] + staged_files,
-        capture_output=True,
-        text=True,
-    )
+    # Format check (blocking) and lint (warning only) are independent - run both at once
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        format_future = executor.submit(
+            subprocess.run,
+            ["ruff", "format", "--check"] + staged_files,
+            capture_output=True,
+            text=True,
+        )
+        lint_future = executor.submit(
+            subprocess.run,
+            ["ruff", "check"] + staged_files,
+            capture_output=True,
+            text=True,
+        )
+        format_result = format_future.result()
+        lint_result = lint_future.result()
 
     if format_result.returncode != 0:
         print("❌ Code is not formatted. Run 'invoke format' to fix:")
@@ -46,13 +92,6 @@ def main():
         print("  git commit")
         return 1
 
-    # Check linting with ruff (warn only, don't block)
-    lint_result = subprocess.run(
-        ["ruff", "check"] + staged_files,
-        capture_output=True,
-        text=True,
-    )
-
     if lint_result.returncode != 0:
         print("⚠️  Linting issues found (not blocking):")
         print(lint_result.stdout)
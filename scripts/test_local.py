@@ -6,18 +6,48 @@ Tests Tuya API connection and Telegram notifications without AWS.
 Usage:
     python scripts/test_local.py --test-tuya      # Test Tuya connection
     python scripts/test_local.py --test-telegram  # Test Telegram notification
+    python scripts/test_local.py --test-telegram --separate-messages  # One message per type
     python scripts/test_local.py --test-all       # Test everything
     python scripts/test_local.py --poll           # Run a single poll (no DynamoDB)
 """
 
 import argparse
 import sys
+from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
+from zoneinfo import ZoneInfo
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
 from config_loader import load_config
+from logic import DebounceState, process_state_change
+from notifier import TelegramNotifier
+from tuya_client import TuyaClient
+
+# Ukrainian month names (genitive), indexed by month number
+MONTHS_UK = (
+    "",
+    "січня",
+    "лютого",
+    "березня",
+    "квітня",
+    "травня",
+    "червня",
+    "липня",
+    "серпня",
+    "вересня",
+    "жовтня",
+    "листопада",
+    "грудня",
+)
+
+
+@lru_cache(maxsize=8)
+def get_timezone(name: str) -> ZoneInfo:
+    """Return ZoneInfo for name, loading the tzdata file only once per name."""
+    return ZoneInfo(name)
 
 
 def test_tuya_connection():
@@ -26,8 +56,6 @@ def test_tuya_connection():
 
     config = load_config(use_env=False)
 
-    from tuya_client import TuyaClient
-
     try:
         client = TuyaClient(config.tuya.endpoint, config.tuya.access_id, config.tuya.access_key)
 
@@ -52,70 +80,57 @@ def test_tuya_connection():
 
 def format_ukrainian_timestamp(tz):
     """Format current time in Ukrainian."""
-    from datetime import datetime
-
-    months_uk = {
-        1: "січня",
-        2: "лютого",
-        3: "березня",
-        4: "квітня",
-        5: "травня",
-        6: "червня",
-        7: "липня",
-        8: "серпня",
-        9: "вересня",
-        10: "жовтня",
-        11: "листопада",
-        12: "грудня",
-    }
-
     now = datetime.now(tz)
     day = now.day
-    month = months_uk[now.month]
+    month = MONTHS_UK[now.month]
     year = now.year
     time_str = now.strftime("%H:%M")
 
     return f"{day} {month} {year} о {time_str}"
 
 
-def test_telegram_notification():
-    """Test Telegram bot notification - sends all message types."""
+def test_telegram_notification(separate_messages: bool = False):
+    """
+    Test Telegram bot notification - sends all message types.
+
+    By default the sample messages are combined into a single Telegram message;
+    pass separate_messages=True to deliver each one on its own.
+    """
     print("📱 Testing Telegram notifications...")
 
     config = load_config(use_env=False)
 
-    from notifier import TelegramNotifier
-    from zoneinfo import ZoneInfo
-    import time
-
     try:
         notifier = TelegramNotifier(config.telegram.bot_token, config.telegram.chat_id)
 
-        tz = ZoneInfo(config.timezone)
+        tz = get_timezone(config.timezone)
         timestamp = format_ukrainian_timestamp(tz)
 
-        # Message 1: Power ON
-        message_on = f"✅ Електрику увімкнено!\n\n🕐 {timestamp}"
-        notifier.send_message(message_on)
-        print(f"  ✓ Надіслано: Електрику увімкнено")
-
-        time.sleep(1)  # Small delay between messages
-
-        # Message 2: Power OFF
-        message_off = f"❌ Електрику вимкнено\n\n🕐 {timestamp}"
-        notifier.send_message(message_off)
-        print(f"  ✓ Надіслано: Електрику вимкнено")
-
-        time.sleep(1)
-
-        # Message 3: Test/status message
-        message_test = (
-            f"🧪 Тестове повідомлення\n\n🕐 {timestamp}\n\nМоніторинг електроживлення працює!"
-        )
-        notifier.send_message(message_test)
-        print(f"  ✓ Надіслано: Тестове повідомлення")
-
-        print(f"\n  📨 Всього надіслано 3 повідомлення до чату {config.telegram.chat_id}")
+        messages = [
+            # Message 1: Power ON
+            ("Електрику увімкнено", f"✅ Електрику увімкнено!\n\n🕐 {timestamp}"),
+            # Message 2: Power OFF
+            ("Електрику вимкнено", f"❌ Електрику вимкнено\n\n🕐 {timestamp}"),
+            # Message 3: Test/status message
+            (
+                "Тестове повідомлення",
+                f"🧪 Тестове повідомлення\n\n🕐 {timestamp}\n\nМоніторинг електроживлення працює!",
+            ),
+        ]
+
+        if separate_messages:
+            for label, message in messages:
+                notifier.send_message(message)
+                print(f"  ✓ Надіслано: {label}")
+            sent = len(messages)
+        else:
+            separator = "\n\n" + "—" * 20 + "\n\n"
+            notifier.send_message(separator.join(message for _, message in messages))
+            for label, _ in messages:
+                print(f"  ✓ Надіслано: {label}")
+            sent = 1
+
+        print(f"\n  📨 Всього надіслано {sent} повідомлення до чату {config.telegram.chat_id}")
 
         return True
 
@@ -130,11 +145,6 @@ def run_single_poll():
 
     config = load_config(use_env=False)
 
-    from tuya_client import TuyaClient
-    from logic import DebounceState, process_state_change
-    from datetime import datetime
-    from zoneinfo import ZoneInfo
-
     try:
         # Query Tuya
         client = TuyaClient(config.tuya.endpoint, config.tuya.access_id, config.tuya.access_key)
@@ -142,7 +152,7 @@ def run_single_poll():
         online = client.get_device_online_status(config.tuya.device_id)
         status = "ONLINE" if online else "OFFLINE"
 
-        tz = ZoneInfo(config.timezone)
+        tz = get_timezone(config.timezone)
         timestamp = datetime.now(tz).strftime("%Y-%m-%d %H:%M:%S %Z")
 
         print(f"  📊 Device status: {status}")
@@ -172,6 +182,11 @@ def main():
     parser.add_argument("--test-telegram", action="store_true", help="Test Telegram notification")
     parser.add_argument("--test-all", action="store_true", help="Run all tests")
     parser.add_argument("--poll", action="store_true", help="Run a single poll")
+    parser.add_argument(
+        "--separate-messages",
+        action="store_true",
+        help="Send each Telegram test message separately instead of one combined message",
+    )
 
     args = parser.parse_args()
 
@@ -191,7 +206,7 @@ def main():
         print()
 
     if args.test_all or args.test_telegram:
-        results.append(("Telegram", test_telegram_notification()))
+        results.append(("Telegram", test_telegram_notification(args.separate_messages)))
         print()
 
     if args.poll:
@@ -3,39 +3,62 @@ AWS Lambda handler for Tuya power monitoring.
 Polls Tuya device status, applies debouncing, and sends Telegram notifications on state changes.
 """
 
-import json
 import os
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache
 from zoneinfo import ZoneInfo
 from typing import Dict, Any
 
-from tuya_client import TuyaClient
-from state_store import StateStore
-from notifier import TelegramNotifier
-from logic import process_state_change, DebounceState
-
-
-# Ukrainian month names for human-friendly timestamps
-MONTHS_UK = {
-    1: "січня",
-    2: "лютого",
-    3: "березня",
-    4: "квітня",
-    5: "травня",
-    6: "червня",
-    7: "липня",
-    8: "серпня",
-    9: "вересня",
-    10: "жовтня",
-    11: "листопада",
-    12: "грудня",
-}
+from json_utils import dumps as _dumps
+from notifier import get_notifier
+
+
+# Ukrainian month names (genitive) for human-friendly timestamps, indexed by month number
+MONTHS_UK = (
+    "",
+    "січня",
+    "лютого",
+    "березня",
+    "квітня",
+    "травня",
+    "червня",
+    "липня",
+    "серпня",
+    "вересня",
+    "жовтня",
+    "листопада",
+    "грудня",
+)
+
+
+def _load_timezone(timezone_str: str) -> ZoneInfo:
+    """Resolve timezone name, falling back to UTC if it is invalid."""
+    try:
+        return ZoneInfo(timezone_str)
+    except Exception as e:
+        print(_dumps({"error": "invalid_timezone", "timezone": timezone_str, "message": str(e)}))
+        return ZoneInfo("UTC")
+
+
+# Resolved once per container - Lambda reuses module state across warm invocations
+TIMEZONE = _load_timezone(os.environ.get("TIMEZONE", "Europe/Kyiv"))
+
+
+# Runs independent network calls (DynamoDB, Tuya) side by side; reused across warm invocations
+_EXECUTOR = ThreadPoolExecutor(max_workers=2)
+
+
+@lru_cache(maxsize=32)
+def _date_prefix(year: int, month: int, day: int) -> str:
+    """Format the date part of a Ukrainian timestamp (only changes once a day)."""
+    return f"{day} {MONTHS_UK[month]} {year} о "
 
 
 def format_ukrainian_timestamp(dt: datetime) -> str:
     """Format datetime in Ukrainian human-friendly format."""
-    return f"{dt.day} {MONTHS_UK[dt.month]} {dt.year} о {dt.strftime('%H:%M')}"
+    return _date_prefix(dt.year, dt.month, dt.day) + dt.strftime("%H:%M")
 
 
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
@@ -46,12 +69,12 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
 
     Steps:
     1. Load previous state from DynamoDB
-    2. Query Tuya device online status
+    2. Query Tuya device online status (concurrently with step 1)
     3. Apply debouncing logic
     4. Send Telegram notification if state changed
-    5. Persist new state to DynamoDB
+    5. Persist new state to DynamoDB (concurrently with step 4; skipped if unchanged)
     """
-    print(json.dumps({"event": "lambda_invoked", "request_id": context.aws_request_id}))
+    print(_dumps({"event": "lambda_invoked", "request_id": context.aws_request_id}))
 
     # Load environment variables
     tuya_endpoint = os.environ["TUYA_ENDPOINT"]
@@ -63,22 +86,14 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     ddb_table = os.environ["DDB_TABLE"]
     debounce_count = int(os.environ.get("DEBOUNCE_COUNT", "2"))
     confirmation_delay_minutes = int(os.environ.get("CONFIRMATION_DELAY_MINUTES", "3"))
-    timezone_str = os.environ.get("TIMEZONE", "Europe/Kyiv")
-
-    try:
-        timezone = ZoneInfo(timezone_str)
-    except Exception as e:
-        print(
-            json.dumps({"error": "invalid_timezone", "timezone": timezone_str, "message": str(e)})
-        )
-        timezone = ZoneInfo("UTC")
+    timezone = TIMEZONE
 
     # Initialize notifier (needed for test mode)
-    notifier = TelegramNotifier(tg_bot_token, tg_chat_id)
+    notifier = get_notifier(tg_bot_token, tg_chat_id)
 
     # Handle test mode
     if event.get("test"):
-        print(json.dumps({"event": "test_mode", "test": True}))
+        print(_dumps({"event": "test_mode", "test": True}))
 
         now = datetime.now(timezone)
         timestamp_str = format_ukrainian_timestamp(now)
@@ -87,31 +102,38 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
 
         try:
             notifier.send_message(message)
-            print(json.dumps({"event": "test_notification_sent", "message": message}))
+            print(_dumps({"event": "test_notification_sent", "message": message}))
             return {
                 "statusCode": 200,
-                "body": json.dumps(
+                "body": _dumps(
                     {"success": True, "test": True, "message": "Test notification sent"}
                 ),
             }
         except Exception as e:
-            print(json.dumps({"event": "test_notification_failed", "error": str(e)}))
-            return {"statusCode": 500, "body": json.dumps({"success": False, "error": str(e)})}
+            print(_dumps({"event": "test_notification_failed", "error": str(e)}))
+            return {"statusCode": 500, "body": _dumps({"success": False, "error": str(e)})}
+
+    # Deferred until after test mode so test invocations skip loading boto3 and the Tuya SDK
+    from logic import DebounceState, process_state_change
+    from state_store import get_state_store
+    from tuya_client import get_tuya_client
 
     # Initialize remaining components
-    state_store = StateStore(ddb_table)
-    tuya_client = TuyaClient(tuya_endpoint, tuya_access_id, tuya_access_key)
+    state_store = get_state_store(ddb_table)
+    tuya_client = get_tuya_client(tuya_endpoint, tuya_access_id, tuya_access_key)
 
     try:
-        # Step 1: Load previous state
-        prev_state = state_store.load_state()
-        print(json.dumps({"event": "state_loaded", "state": prev_state}))
+        # Steps 1-2: Load previous state and query Tuya device concurrently
+        state_future = _EXECUTOR.submit(state_store.load_state)
+        tuya_future = _EXECUTOR.submit(tuya_client.get_device_online_status, tuya_device_id)
+
+        prev_state = state_future.result()
+        print(_dumps({"event": "state_loaded", "state": prev_state}))
 
-        # Step 2: Query Tuya device
         try:
-            device_online = tuya_client.get_device_online_status(tuya_device_id)
+            device_online = tuya_future.result()
             print(
-                json.dumps(
+                _dumps(
                     {
                         "event": "tuya_query_success",
                         "device_id": tuya_device_id,
@@ -121,7 +143,7 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             )
         except Exception as tuya_error:
             print(
-                json.dumps(
+                _dumps(
                     {
                         "event": "tuya_query_failed",
                         "error": str(tuya_error),
@@ -132,12 +154,12 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             # Don't change state if Tuya API fails
             return {
                 "statusCode": 500,
-                "body": json.dumps({"error": "tuya_api_failed", "message": str(tuya_error)}),
+                "body": _dumps({"error": "tuya_api_failed", "message": str(tuya_error)}),
             }
 
-        # Save the first_observed_change_ts BEFORE processing (we need it for the timestamp)
+        # Save the first_observed_change_ts_ns BEFORE processing (we need it for the timestamp)
         # This is when the state change was FIRST detected (streak=1)
-        prev_first_observed_change_ts = prev_state.get("first_observed_change_ts")
+        prev_first_observed_change_ts_ns = prev_state.get("first_observed_change_ts_ns")
 
         # Step 3: Apply debouncing and state transition logic
         new_state, should_notify = process_state_change(
@@ -149,7 +171,7 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
 
         new_state_dict = new_state.to_dict()
         print(
-            json.dumps(
+            _dumps(
                 {
                     "event": "state_processed",
                     "new_state": new_state_dict,
@@ -158,13 +180,20 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             )
         )
 
+        # Step 5: Persist new state in the background while step 4 talks to Telegram.
+        # save_state gets its own copy since step 4 may still annotate new_state_dict;
+        # it skips the write when nothing changed (the common case).
+        save_future = _EXECUTOR.submit(state_store.save_state, dict(new_state_dict))
+
         # Step 4: Send notification if state changed
         notification_sent = False
         if should_notify:
             # Use the timestamp when the change was FIRST observed (streak=1)
             # This shows when the outage actually started, not when it was confirmed
-            if prev_first_observed_change_ts is not None:
-                event_time = datetime.fromtimestamp(prev_first_observed_change_ts, tz=timezone)
+            if prev_first_observed_change_ts_ns is not None:
+                event_time = datetime.fromtimestamp(
+                    prev_first_observed_change_ts_ns / 1e9, tz=timezone
+                )
             else:
                 # Fallback to now if no timestamp (shouldn't happen)
                 event_time = datetime.now(timezone)
@@ -180,18 +209,18 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                 notifier.send_message(message)
                 notification_sent = True
                 print(
-                    json.dumps(
+                    _dumps(
                         {
                             "event": "notification_sent",
                             "message": message,
                             "event_timestamp": timestamp_str,
-                            "first_observed_at": prev_first_observed_change_ts,
+                            "first_observed_at_ns": prev_first_observed_change_ts_ns,
                         }
                     )
                 )
             except Exception as notif_error:
                 print(
-                    json.dumps(
+                    _dumps(
                         {
                             "event": "notification_failed",
                             "error": str(notif_error),
@@ -199,16 +228,18 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                         }
                     )
                 )
-                # Mark notification failure but continue to save state
+                # Report the failure in the response; the state is saved regardless
                 new_state_dict["notify_failed"] = True
 
-        # Step 5: Persist new state
-        state_store.save_state(new_state_dict)
-        print(json.dumps({"event": "state_saved", "state": new_state_dict}))
+        # Wait for the state write (re-raises DynamoDB errors)
+        if save_future.result():
+            print(_dumps({"event": "state_saved", "state": new_state_dict}))
+        else:
+            print(_dumps({"event": "state_unchanged"}))
 
         return {
             "statusCode": 200,
-            "body": json.dumps(
+            "body": _dumps(
                 {
                     "success": True,
                     "device_online": device_online,
@@ -220,11 +251,11 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
 
     except Exception as e:
         print(
-            json.dumps(
+            _dumps(
                 {"event": "unhandled_error", "error": str(e), "traceback": traceback.format_exc()}
             )
         )
         return {
             "statusCode": 500,
-            "body": json.dumps({"error": "internal_error", "message": str(e)}),
+            "body": _dumps({"error": "internal_error", "message": str(e)}),
         }
@@ -3,12 +3,33 @@ Configuration loader for Tuya Power Monitor.
 Loads settings from config.yaml (local) or environment variables (Lambda).
 """
 
+import configparser
+import copy
+import json
 import os
+from collections import OrderedDict
+from functools import reduce
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 from dataclasses import dataclass
 
 
+# Parsed YAML files keyed by absolute path -> (st_mtime, st_size, parsed dict).
+# Scripts call load_yaml_config several times per run; this avoids re-parsing.
+_YAML_CACHE: "OrderedDict[str, Tuple[float, int, Dict[str, Any]]]" = OrderedDict()
+_YAML_CACHE_MAX_ENTRIES = 100
+
+# Keys every config.yaml must define, as paths into the nested config dict
+_REQUIRED_KEYS = (
+    ("tuya", "endpoint"),
+    ("tuya", "access_id"),
+    ("tuya", "access_key"),
+    ("tuya", "device_id"),
+    ("telegram", "bot_token"),
+    ("telegram", "chat_id"),
+)
+
+
 @dataclass
 class TuyaConfig:
     endpoint: str
@@ -44,6 +65,7 @@ def load_yaml_config(config_path: Optional[str] = None) -> Dict[str, Any]:
 
     Raises:
         FileNotFoundError: If config file doesn't exist
+        KeyError: If a required key is missing (named as a dotted path, e.g. "tuya.endpoint")
     """
     try:
         import yaml
@@ -52,6 +74,12 @@ def load_yaml_config(config_path: Optional[str] = None) -> Dict[str, Any]:
             "PyYAML required for config file support. Install with: pip install pyyaml"
         )
 
+    # Prefer the libyaml-backed C loader; fall back to pure Python if PyYAML was built without it
+    try:
+        from yaml import CSafeLoader as SafeLoader
+    except ImportError:
+        from yaml import SafeLoader
+
     if config_path is None:
         # Look for config.yaml in project root (parent of src/)
         src_dir = Path(__file__).parent
@@ -59,14 +87,104 @@ def load_yaml_config(config_path: Optional[str] = None) -> Dict[str, Any]:
     else:
         config_path = Path(config_path)
 
-    if not config_path.exists():
+    config_path = config_path.resolve()
+
+    try:
+        stat = config_path.stat()
+    except FileNotFoundError:
         raise FileNotFoundError(
             f"Config file not found: {config_path}\n"
             f"Copy config.template.yaml to config.yaml and fill in your credentials."
-        )
+        ) from None
+
+    # Serve from cache if the file is unchanged; copy so callers can't mutate the cached dict
+    cache_key = str(config_path)
+    cached = _YAML_CACHE.get(cache_key)
+    if cached is not None and cached[0] == stat.st_mtime and cached[1] == stat.st_size:
+        _YAML_CACHE.move_to_end(cache_key)
+        return copy.deepcopy(cached[2])
+
+    cfg = _load_json_sidecar(config_path, stat)
+    if cfg is None:
+        with open(config_path, "r") as f:
+            cfg = yaml.load(f, Loader=SafeLoader)
+        _write_json_sidecar(config_path, stat, cfg)
+
+    _validate(cfg)
 
-    with open(config_path, "r") as f:
-        return yaml.safe_load(f)
+    _YAML_CACHE[cache_key] = (stat.st_mtime, stat.st_size, cfg)
+    _YAML_CACHE.move_to_end(cache_key)
+    if len(_YAML_CACHE) > _YAML_CACHE_MAX_ENTRIES:
+        _YAML_CACHE.popitem(last=False)
+
+    return copy.deepcopy(cfg)
+
+
+def _validate(cfg: Dict[str, Any]) -> None:
+    """
+    Check that all required keys are present in one pass.
+
+    Raises:
+        KeyError: Naming the first missing key as a dotted path
+    """
+    for path in _REQUIRED_KEYS:
+        try:
+            reduce(dict.__getitem__, path, cfg)
+        except (KeyError, TypeError):
+            raise KeyError(".".join(path)) from None
+
+
+def _json_sidecar_path(config_path: Path) -> Path:
+    """Return path of the JSON cache written next to a YAML config file."""
+    return config_path.with_name(config_path.name + ".cache.json")
+
+
+def _load_json_sidecar(config_path: Path, stat: os.stat_result) -> Optional[Dict[str, Any]]:
+    """
+    Load the JSON cache of a YAML config if it was written from the current YAML file.
+
+    The sidecar records the st_mtime_ns and st_size of the YAML it was parsed from and
+    is only used on an exact match, so restoring an older config.yaml (which keeps its
+    old mtime) invalidates it just like editing does.
+
+    Returns:
+        Parsed config dictionary, or None if the cache is missing, stale or unreadable
+    """
+    sidecar = _json_sidecar_path(config_path)
+    try:
+        with open(sidecar) as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if (
+        not isinstance(cached, dict)
+        or cached.get("source_mtime_ns") != stat.st_mtime_ns
+        or cached.get("source_size") != stat.st_size
+    ):
+        return None
+    return cached.get("config")
+
+
+def _write_json_sidecar(config_path: Path, stat: os.stat_result, cfg: Dict[str, Any]) -> None:
+    """
+    Write parsed config as JSON next to the YAML file (best effort).
+
+    The cache holds the same secrets as config.yaml, so it gets the same permissions.
+    """
+    sidecar = _json_sidecar_path(config_path)
+    tmp_path = sidecar.with_name(sidecar.name + ".tmp")
+    cached = {"source_mtime_ns": stat.st_mtime_ns, "source_size": stat.st_size, "config": cfg}
+    try:
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, stat.st_mode & 0o777)
+        with os.fdopen(fd, "w") as f:
+            json.dump(cached, f)
+        os.replace(tmp_path, sidecar)
+    except (OSError, TypeError, ValueError):
+        # Read-only directory or YAML types JSON can't represent - just skip the cache
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
 
 
 def load_config(use_env: bool = True, config_path: Optional[str] = None) -> AppConfig:
@@ -145,11 +263,13 @@ def configure_aws_cli(config_path: Optional[str] = None) -> None:
     """
     Configure AWS CLI using credentials from config file.
 
+    Writes the [default] profile straight into the shared credentials and config
+    files (honouring AWS_SHARED_CREDENTIALS_FILE / AWS_CONFIG_FILE), the same
+    files `aws configure set` would update. Other profiles are preserved.
+
     Args:
         config_path: Optional path to config file
     """
-    import subprocess
-
     aws_cfg = get_aws_config(config_path)
 
     if not aws_cfg["access_key_id"] or aws_cfg["access_key_id"].startswith("AKIA..."):
@@ -158,17 +278,56 @@ def configure_aws_cli(config_path: Optional[str] = None) -> None:
     if not aws_cfg["secret_access_key"] or aws_cfg["secret_access_key"] == "your_secret":
         raise ValueError("AWS secret_access_key not configured in config.yaml")
 
-    # Configure AWS CLI
-    subprocess.run(
-        ["aws", "configure", "set", "aws_access_key_id", aws_cfg["access_key_id"]], check=True
-    )
-    subprocess.run(
-        ["aws", "configure", "set", "aws_secret_access_key", aws_cfg["secret_access_key"]],
-        check=True,
+    credentials_path = Path(
+        os.environ.get("AWS_SHARED_CREDENTIALS_FILE", "~/.aws/credentials")
+    ).expanduser()
+    cli_config_path = Path(os.environ.get("AWS_CONFIG_FILE", "~/.aws/config")).expanduser()
+
+    _update_ini_section(
+        credentials_path,
+        "default",
+        {
+            "aws_access_key_id": aws_cfg["access_key_id"],
+            "aws_secret_access_key": aws_cfg["secret_access_key"],
+        },
     )
-    subprocess.run(["aws", "configure", "set", "region", aws_cfg["region"]], check=True)
-    subprocess.run(["aws", "configure", "set", "output", "json"], check=True)
+    _update_ini_section(cli_config_path, "default", {"region": aws_cfg["region"], "output": "json"})
 
     print(f"✅ AWS CLI configured")
     print(f"   Region: {aws_cfg['region']}")
     print(f"   Access Key ID: {aws_cfg['access_key_id'][:8]}...")
+
+
+def _update_ini_section(path: Path, section: str, values: Dict[str, str]) -> None:
+    """
+    Set keys in one section of an AWS INI file, keeping it private to the user.
+
+    The file is written to a temporary file and swapped in, so an interrupted write
+    never loses the other profiles.
+
+    Raises:
+        ValueError: If the existing file can't be parsed (e.g. duplicate sections or keys)
+    """
+    parser = configparser.RawConfigParser()
+    try:
+        parser.read(path)
+    except configparser.Error as e:
+        raise ValueError(f"Cannot update {path}, fix it by hand first: {e}") from e
+    if not parser.has_section(section):
+        parser.add_section(section)
+    for key, value in values.items():
+        parser.set(section, key, value)
+
+    path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    try:
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as f:
+            parser.write(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
@@ -0,0 +1,28 @@
+"""
+JSON serialization helpers.
+Use orjson when it is installed and fall back to the standard library otherwise.
+"""
+
+import json
+from typing import Any
+
+try:
+    import orjson
+
+    _HAS_ORJSON = True
+except ImportError:  # orjson is optional; fall back to stdlib json
+    _HAS_ORJSON = False
+
+
+def dumps(obj: Any) -> str:
+    """Serialize to a JSON string (log events, response bodies)."""
+    if _HAS_ORJSON:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj)
+
+
+def dumps_bytes(obj: Any) -> bytes:
+    """Serialize to UTF-8 JSON bytes (HTTP request bodies)."""
+    if _HAS_ORJSON:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode("utf-8")
@@ -4,48 +4,155 @@ Pure functions for testability.
 """
 
 import time
-from dataclasses import dataclass, asdict
-from typing import Optional, Tuple
+import weakref
+from dataclasses import dataclass
+from enum import IntEnum
+from functools import cache, lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
 
 
-@dataclass
+@dataclass(frozen=True, slots=True, weakref_slot=True)
 class DebounceState:
     """
-    State structure for debouncing logic.
+    Immutable state structure for debouncing logic.
 
     Attributes:
         last_confirmed_online: Last confirmed power state (True=on, False=off, None=unknown)
         last_observed_online: Most recent observed power state
         streak: Number of consecutive polls showing last_observed_online
-        last_change_ts: Unix timestamp of last confirmed state change
-        last_message_ts: Unix timestamp of last notification sent
-        pending_change_since: Unix timestamp when potential state change was first detected
-                             (debounce threshold reached but waiting for confirmation delay)
-        first_observed_change_ts: Unix timestamp when the current observation streak started
-                                  (when we first saw the new state, for notification timestamp)
+        last_change_ts_ns: Unix time (ns) of last confirmed state change
+        last_message_ts_ns: Unix time (ns) of last notification sent
+        pending_change_since_ns: Unix time (ns) when potential state change was first detected
+                                 (debounce threshold reached but waiting for confirmation delay)
+        first_observed_change_ts_ns: Unix time (ns) when the current observation streak started
+                                     (when we first saw the new state, for notification timestamp)
+
+    Timestamps are integer nanoseconds from time.time_ns(): exact to compare and hash,
+    and they map onto int64 arrays without NaN sentinels. They are wall-clock rather
+    than monotonic because they are persisted and shown to users.
     """
 
     last_confirmed_online: Optional[bool] = None
     last_observed_online: Optional[bool] = None
     streak: int = 0
-    last_change_ts: Optional[float] = None
-    last_message_ts: Optional[float] = None
-    pending_change_since: Optional[float] = None  # for confirmation delay
-    first_observed_change_ts: Optional[float] = None  # when the change was FIRST observed
+    last_change_ts_ns: Optional[int] = None
+    last_message_ts_ns: Optional[int] = None
+    pending_change_since_ns: Optional[int] = None  # for confirmation delay
+    first_observed_change_ts_ns: Optional[int] = None  # when the change was FIRST observed
+
+    @classmethod
+    def of(
+        cls,
+        last_confirmed_online: Optional[bool] = None,
+        last_observed_online: Optional[bool] = None,
+        streak: int = 0,
+        last_change_ts_ns: Optional[int] = None,
+        last_message_ts_ns: Optional[int] = None,
+        pending_change_since_ns: Optional[int] = None,
+        first_observed_change_ts_ns: Optional[int] = None,
+    ) -> "DebounceState":
+        """
+        Return a shared instance equal to DebounceState(...) with the same arguments.
+
+        States are immutable, so equal ones can be the same object: repeated lookups of
+        a common state (e.g. in tests) return it instead of allocating a new one.
+        Instances are held weakly and dropped once nothing else references them.
+
+        Returns:
+            Interned DebounceState
+        """
+        key = (
+            last_confirmed_online,
+            last_observed_online,
+            streak,
+            last_change_ts_ns,
+            last_message_ts_ns,
+            pending_change_since_ns,
+            first_observed_change_ts_ns,
+        )
+        state = _interned.get(key)
+        if state is None:
+            state = _interned[key] = cls(*key)
+        return state
 
     def to_dict(self) -> dict:
         """Convert to dictionary for storage."""
-        return asdict(self)
+        # Spelled out: dataclasses.asdict recurses and deep-copies every field, which is
+        # ~30x slower for these scalars; the tests check it stays equal to asdict().
+        return {
+            "last_confirmed_online": self.last_confirmed_online,
+            "last_observed_online": self.last_observed_online,
+            "streak": self.streak,
+            "last_change_ts_ns": self.last_change_ts_ns,
+            "last_message_ts_ns": self.last_message_ts_ns,
+            "pending_change_since_ns": self.pending_change_since_ns,
+            "first_observed_change_ts_ns": self.first_observed_change_ts_ns,
+        }
 
 
-def process_state_change(
+# Interned states for DebounceState.of, keyed by their field values
+_interned: "weakref.WeakValueDictionary[tuple, DebounceState]" = weakref.WeakValueDictionary()
+
+
+# Outcomes of a debounce step, besides the updated observation and streak
+_NO_CHANGE = 0
+_INITIAL = 1  # first confirmed state can be established (never notified)
+_CHANGE = 2  # observation differs from the confirmed state and reached the threshold
+
+
+@lru_cache(maxsize=256)
+def _debounce_step(
+    confirmed: Optional[bool],
+    observed: Optional[bool],
+    streak: int,
+    current_online: bool,
+    debounce_threshold: int,
+) -> Tuple[bool, int, bool, int]:
+    """
+    Timestamp-free part of a state transition.
+
+    Pure and memoized: the inputs take only a few dozen distinct values, so repeated
+    transitions are a cache hit instead of re-running the branches.
+
+    Args:
+        confirmed: Last confirmed power state
+        observed: Last observed power state
+        streak: Number of consecutive polls showing observed
+        current_online: Current device online status
+        debounce_threshold: Number of consecutive readings required
+
+    Returns:
+        Tuple of (observed, streak, observation_changed, outcome)
+    """
+    if current_online == observed:
+        # Same observation, increment streak (cap at threshold + 1 to avoid overflow)
+        streak = min(streak + 1, debounce_threshold + 1)
+        observation_changed = False
+    else:
+        # Different observation, reset
+        streak = 1
+        observation_changed = True
+
+    if streak < debounce_threshold:
+        outcome = _NO_CHANGE
+    elif confirmed is None:
+        outcome = _INITIAL
+    elif current_online != confirmed:
+        outcome = _CHANGE
+    else:
+        outcome = _NO_CHANGE
+    return current_online, streak, observation_changed, outcome
+
+
+def step(
     prev_state: DebounceState,
     current_online: bool,
     debounce_threshold: int,
     confirmation_delay_seconds: int = 0,
-) -> Tuple[DebounceState, bool]:
+    on_change: Optional[Callable[[DebounceState], None]] = None,
+) -> DebounceState:
     """
-    Process a new online status reading and determine if notification should be sent.
+    Process a new online status reading, calling on_change if a notification is due.
 
     Two-phase debouncing logic:
     Phase 1 (debounce): Wait for N consecutive polls showing the same state
@@ -61,69 +168,377 @@ def process_state_change(
         current_online: Current device online status
         debounce_threshold: Number of consecutive readings required to start confirmation
         confirmation_delay_seconds: Additional seconds to wait after debounce before notifying
+        on_change: Called with the new state when a confirmed change should be notified
 
     Returns:
-        Tuple of (new_state, should_notify)
+        New state
     """
-    now = time.time()
+    now = time.time_ns()
 
-    new_state = DebounceState(
-        last_confirmed_online=prev_state.last_confirmed_online,
-        last_observed_online=prev_state.last_observed_online,
-        streak=prev_state.streak,
-        last_change_ts=prev_state.last_change_ts,
-        last_message_ts=prev_state.last_message_ts,
-        pending_change_since=prev_state.pending_change_since,
-        first_observed_change_ts=prev_state.first_observed_change_ts,
-    )
+    confirmed = prev_state.last_confirmed_online
+    last_change_ts_ns = prev_state.last_change_ts_ns
+    last_message_ts_ns = prev_state.last_message_ts_ns
+    pending_change_since_ns = prev_state.pending_change_since_ns
+    first_observed_change_ts_ns = prev_state.first_observed_change_ts_ns
 
     # Update observation and streak
-    if current_online == prev_state.last_observed_online:
-        # Same observation, increment streak (cap at threshold + 1 to avoid overflow)
-        new_state.streak = min(prev_state.streak + 1, debounce_threshold + 1)
-    else:
-        # Different observation, reset
-        new_state.last_observed_online = current_online
-        new_state.streak = 1
+    observed, streak, observation_changed, outcome = _debounce_step(
+        confirmed,
+        prev_state.last_observed_online,
+        prev_state.streak,
+        current_online,
+        debounce_threshold,
+    )
+    if observation_changed:
         # Record when we FIRST observed this new state (for notification timestamp)
-        new_state.first_observed_change_ts = now
+        first_observed_change_ts_ns = now
         # If we had a pending change and the state reverted, cancel it
-        if prev_state.pending_change_since is not None:
-            new_state.pending_change_since = None
+        pending_change_since_ns = None
 
     # Check if we should confirm a state change
     should_notify = False
 
-    # State change detection logic (only if we have a confirmed state to compare with)
-    if (
-        new_state.last_confirmed_online is not None
-        and new_state.last_observed_online != new_state.last_confirmed_online
-        and new_state.streak >= debounce_threshold
-    ):
+    # State change detection (only if we have a confirmed state to compare with)
+    if outcome == _CHANGE:
         # Debounce threshold reached - is this a new detection or continuation?
-        if new_state.pending_change_since is None:
+        if pending_change_since_ns is None:
             # New potential state change detected - start confirmation timer
-            new_state.pending_change_since = now
+            pending_change_since_ns = now
 
         # Check if confirmation delay has passed
-        elapsed = now - new_state.pending_change_since
-        if elapsed >= confirmation_delay_seconds:
+        elapsed_ns = now - pending_change_since_ns
+        if elapsed_ns >= confirmation_delay_seconds * 1_000_000_000:
             # Confirmation delay passed - state change confirmed!
-            new_state.last_confirmed_online = new_state.last_observed_online
-            new_state.last_change_ts = now
-            new_state.last_message_ts = now
-            new_state.pending_change_since = None  # Clear pending
+            confirmed = observed
+            last_change_ts_ns = now
+            last_message_ts_ns = now
+            pending_change_since_ns = None  # Clear pending
             should_notify = True
 
     # Handle initial state (first time we have data)
-    elif new_state.last_confirmed_online is None and new_state.streak >= debounce_threshold:
+    elif outcome == _INITIAL:
         # Initial state confirmed (no delay needed for initial state)
-        new_state.last_confirmed_online = new_state.last_observed_online
-        new_state.last_change_ts = now
+        confirmed = observed
+        last_change_ts_ns = now
         # Don't notify on initial state establishment
-        should_notify = False
 
-    return new_state, should_notify
+    # DebounceState is frozen, so the successor is built once from the locals above
+    new_state = DebounceState(
+        last_confirmed_online=confirmed,
+        last_observed_online=observed,
+        streak=streak,
+        last_change_ts_ns=last_change_ts_ns,
+        last_message_ts_ns=last_message_ts_ns,
+        pending_change_since_ns=pending_change_since_ns,
+        first_observed_change_ts_ns=first_observed_change_ts_ns,
+    )
+    if should_notify and on_change is not None:
+        on_change(new_state)
+    return new_state
+
+
+def process_state_change(
+    prev_state: DebounceState,
+    current_online: bool,
+    debounce_threshold: int,
+    confirmation_delay_seconds: int = 0,
+) -> Tuple[DebounceState, bool]:
+    """
+    Process a new online status reading and determine if notification should be sent.
+
+    Same as step, returning the notification decision instead of calling back.
+
+    Args:
+        prev_state: Previous debounce state
+        current_online: Current device online status
+        debounce_threshold: Number of consecutive readings required to start confirmation
+        confirmation_delay_seconds: Additional seconds to wait after debounce before notifying
+
+    Returns:
+        Tuple of (new_state, should_notify)
+    """
+    notified: List[DebounceState] = []
+    new_state = step(
+        prev_state,
+        current_online,
+        debounce_threshold,
+        confirmation_delay_seconds,
+        notified.append,
+    )
+    return new_state, bool(notified)
+
+
+class ControlState(IntEnum):
+    """Power state as a small int, for the compact encodings (None/True/False otherwise)."""
+
+    UNKNOWN = 0
+    ONLINE = 1
+    OFFLINE = 2
+
+    @classmethod
+    def from_online(cls, online: Optional[bool]) -> "ControlState":
+        """Convert an Optional[bool] power state."""
+        if online is None:
+            return cls.UNKNOWN
+        return cls.ONLINE if online else cls.OFFLINE
+
+    def to_online(self) -> Optional[bool]:
+        """Convert back to an Optional[bool] power state."""
+        return None if self is ControlState.UNKNOWN else self is ControlState.ONLINE
+
+
+# Packed control state: the timestamp-free fields of DebounceState in one int.
+# Bits 0-1 hold the confirmed ControlState, bits 2-3 the observed one, and the
+# streak sits above them.
+_TABLE_THRESHOLDS = range(2, 6)
+
+
+def pack_state(confirmed: Optional[bool], observed: Optional[bool], streak: int) -> int:
+    """
+    Pack the timestamp-free debounce fields into an int.
+
+    Args:
+        confirmed: Last confirmed power state
+        observed: Last observed power state
+        streak: Number of consecutive polls showing observed
+
+    Returns:
+        Packed state
+    """
+    return (
+        ControlState.from_online(confirmed) | ControlState.from_online(observed) << 2 | streak << 4
+    )
+
+
+def unpack_state(packed: int) -> Tuple[Optional[bool], Optional[bool], int]:
+    """
+    Reverse pack_state.
+
+    Args:
+        packed: Packed state
+
+    Returns:
+        Tuple of (confirmed, observed, streak)
+    """
+    confirmed = ControlState(packed & 0b11).to_online()
+    observed = ControlState(packed >> 2 & 0b11).to_online()
+    return confirmed, observed, packed >> 4
+
+
+@cache
+def transition_table() -> Dict[Tuple[int, bool, int], Tuple[int, bool]]:
+    """
+    Return the packed transition table for thresholds 2-5 with no confirmation delay.
+
+    Maps (packed_state, current_online, debounce_threshold) to (packed_state,
+    should_notify) for every reachable state (streak up to threshold + 1), so a
+    fold over many readings is one dict lookup per step with no DebounceState
+    allocated. Built on first call rather than at import to keep cold starts lean.
+
+    Returns:
+        Transition table
+    """
+    table = {}
+    for threshold in _TABLE_THRESHOLDS:
+        for confirmed in (None, False, True):
+            for observed in (None, False, True):
+                for streak in range(threshold + 2):
+                    packed = pack_state(confirmed, observed, streak)
+                    for current_online in (False, True):
+                        new_observed, new_streak, _, outcome = _debounce_step(
+                            confirmed, observed, streak, current_online, threshold
+                        )
+                        new_confirmed = new_observed if outcome != _NO_CHANGE else confirmed
+                        table[packed, current_online, threshold] = (
+                            pack_state(new_confirmed, new_observed, new_streak),
+                            outcome == _CHANGE,
+                        )
+    return table
+
+
+@lru_cache(maxsize=8)
+def transition_array(debounce_threshold: int):
+    """
+    Return the transition table for one threshold as a dense NumPy int8 array.
+
+    Indexed as [confirmed, observed, streak, current_online] (ControlState values,
+    streak up to threshold + 1, reading as 0/1), each row holding (confirmed,
+    observed, streak, should_notify) after the reading, with no confirmation delay.
+    NumPy is imported lazily; the Lambda path never uses this table.
+
+    Args:
+        debounce_threshold: Number of consecutive readings required
+
+    Returns:
+        Read-only int8 array of shape (3, 3, threshold + 2, 2, 4)
+    """
+    import numpy as np
+
+    table = np.zeros((3, 3, debounce_threshold + 2, 2, 4), dtype=np.int8)
+    for confirmed in ControlState:
+        for observed in ControlState:
+            for streak in range(debounce_threshold + 2):
+                for current_online in (False, True):
+                    new_observed, new_streak, _, outcome = _debounce_step(
+                        confirmed.to_online(),
+                        observed.to_online(),
+                        streak,
+                        current_online,
+                        debounce_threshold,
+                    )
+                    new_confirmed = (
+                        ControlState.from_online(new_observed)
+                        if outcome != _NO_CHANGE
+                        else confirmed
+                    )
+                    table[confirmed, observed, streak, int(current_online)] = (
+                        new_confirmed,
+                        ControlState.from_online(new_observed),
+                        new_streak,
+                        outcome == _CHANGE,
+                    )
+    # The array is shared through the cache, so callers must not be able to mutate it
+    table.flags.writeable = False
+    return table
+
+
+# Mean run length from which the batch entrypoint walks runs instead of vectorizing
+_MIN_MEAN_RUN_FOR_WALK = 32
+
+
+def process_state_changes_batch(
+    observations,
+    debounce_threshold: int,
+    initial_state: Optional[DebounceState] = None,
+    timestamps_ns=None,
+):
+    """
+    Run a whole tape of readings through the debounce logic in one batch.
+
+    Equivalent to folding process_state_change over the tape with no confirmation
+    delay, but without a Python step per reading. Real tapes are mostly long runs of
+    the same reading, which are walked run by run; tapes that flip often are handled
+    with vectorized NumPy operations instead. NumPy is imported lazily since the
+    Lambda only ever processes one reading at a time.
+
+    Args:
+        observations: Online readings, as a bytes tape of 0/1 bytes or any sequence
+                      np.asarray accepts as bool
+        debounce_threshold: Number of consecutive readings required to confirm a state
+        initial_state: State before the first reading (defaults to an empty state)
+        timestamps_ns: Unix time (ns) of each reading; defaults to now for all of them,
+                       as an immediate fold with process_state_change would record
+
+    Returns:
+        Tuple of (confirmed, notify, change_ts_ns) arrays aligned with the readings:
+        confirmed is int8 (1=online, 0=offline, -1=unknown), notify is bool, and
+        change_ts_ns is int64 holding last_change_ts_ns after each reading (0 if unset)
+
+    Raises:
+        ValueError: If timestamps_ns doesn't hold exactly one timestamp per reading
+    """
+    import numpy as np
+
+    state = initial_state if initial_state is not None else DebounceState()
+    if isinstance(observations, (bytes, bytearray)):
+        obs = np.frombuffer(observations, dtype=np.uint8).astype(bool)
+    else:
+        obs = np.asarray(observations, dtype=bool).ravel()
+    if obs.size == 0:
+        return np.empty(0, dtype=np.int8), np.empty(0, dtype=bool), np.empty(0, dtype=np.int64)
+
+    flips = np.count_nonzero(obs[1:] != obs[:-1])
+    if obs.size >= _MIN_MEAN_RUN_FOR_WALK * (flips + 1):
+        confirmed, notify = _walk_runs(obs, debounce_threshold, state)
+    else:
+        confirmed, notify = _vectorized_batch(obs, debounce_threshold, state)
+
+    # last_change_ts_ns moves whenever the confirmed state changes, including the
+    # initial confirmation (which doesn't notify)
+    if timestamps_ns is None:
+        timestamps_ns = np.full(obs.size, time.time_ns(), dtype=np.int64)
+    else:
+        timestamps_ns = np.asarray(timestamps_ns, dtype=np.int64)
+        if timestamps_ns.shape != obs.shape:
+            raise ValueError(f"timestamps_ns has shape {timestamps_ns.shape}, expected {obs.shape}")
+    initial = -1 if state.last_confirmed_online is None else int(state.last_confirmed_online)
+    changed = np.empty(obs.size, dtype=bool)
+    changed[0] = confirmed[0] != initial
+    changed[1:] = confirmed[1:] != confirmed[:-1]
+    idx = np.arange(obs.size)
+    last_changed = np.maximum.accumulate(np.where(changed, idx, -1))
+    change_ts_ns = np.where(
+        last_changed >= 0, timestamps_ns[last_changed], state.last_change_ts_ns or 0
+    ).astype(np.int64)
+
+    return confirmed, notify, change_ts_ns
+
+
+def _walk_runs(obs, debounce_threshold: int, state: DebounceState):
+    """Batch a tape run by run, finding each run's end with bytes.find (memchr)."""
+    import numpy as np
+
+    size = obs.size
+    tape = obs.view(np.uint8).tobytes()
+    confirmed = np.empty(size, dtype=np.int8)
+    notify = np.zeros(size, dtype=bool)
+
+    current = -1 if state.last_confirmed_online is None else int(state.last_confirmed_online)
+    # Only the first run can continue the streak carried in from the previous state
+    carried = state.streak if bool(obs[0]) == state.last_observed_online else 0
+    start = 0
+    while start < size:
+        value = tape[start]
+        end = tape.find(b"\x00" if value else b"\x01", start)
+        if end == -1:
+            end = size
+
+        # Index within the run where the streak reaches the threshold
+        reached = start + max(debounce_threshold - carried - 1, 0)
+        if reached < end:
+            confirmed[start:reached] = current
+            if value != current:
+                notify[reached] = current != -1
+                current = value
+            confirmed[reached:end] = current
+        else:
+            confirmed[start:end] = current
+
+        carried = 0
+        start = end
+
+    return confirmed, notify
+
+
+def _vectorized_batch(obs, debounce_threshold: int, state: DebounceState):
+    """Batch a tape with whole-array NumPy operations (best when runs are short)."""
+    import numpy as np
+
+    idx = np.arange(obs.size)
+
+    # Run boundaries: a run starts wherever the reading differs from the one before it
+    changes = np.empty(obs.size, dtype=bool)
+    changes[0] = state.last_observed_online is None or bool(obs[0]) != state.last_observed_online
+    changes[1:] = obs[1:] != obs[:-1]
+    run_start = np.maximum.accumulate(np.where(changes, idx, 0))
+    streak = idx - run_start + 1
+    if not changes[0]:
+        # The first run continues the streak carried in from the previous state
+        streak[run_start == 0] += state.streak
+    np.minimum(streak, debounce_threshold + 1, out=streak)
+
+    # Confirmed state is the reading at the latest index where the threshold was met
+    last_reached = np.maximum.accumulate(np.where(streak >= debounce_threshold, idx, -1))
+    initial = -1 if state.last_confirmed_online is None else int(state.last_confirmed_online)
+    confirmed = np.where(last_reached >= 0, obs[last_reached], initial).astype(np.int8)
+
+    # Notify on every change of an already-known confirmed state
+    previous = np.empty_like(confirmed)
+    previous[0] = initial
+    previous[1:] = confirmed[:-1]
+    notify = (confirmed != previous) & (previous != -1)
+
+    return confirmed, notify
 
 
 def format_state_summary(state: DebounceState) -> str:
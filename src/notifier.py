@@ -3,8 +3,11 @@ Telegram notification sender.
 Sends messages via Telegram Bot API.
 """
 
-import requests
-from typing import Dict, Any
+import json
+import time
+from typing import Dict, Any, Optional
+
+from json_utils import dumps_bytes
 
 
 class TelegramNotifier:
@@ -35,17 +38,103 @@ class TelegramNotifier:
         Raises:
             Exception: If message sending fails
         """
+        import urllib3
+
         payload = {"chat_id": self.chat_id, "text": text, "parse_mode": "HTML"}
 
         try:
-            response = requests.post(self.api_url, json=payload, timeout=10)
-            response.raise_for_status()
+            response = _get_http().request(
+                "POST",
+                self.api_url,
+                body=dumps_bytes(payload),
+                headers={"Content-Type": "application/json"},
+            )
+        except urllib3.exceptions.HTTPError as e:
+            raise Exception(f"Failed to send Telegram message: {str(e)}") from e
+        finally:
+            _mark_http_used()
+
+        if response.status >= 400:
+            # Telegram explains 4xx rejections (bad chat_id, malformed HTML) in the body
+            try:
+                description = json.loads(response.data).get("description")
+            except (ValueError, AttributeError):
+                description = None
+            detail = f": {description}" if description else ""
+            raise Exception(f"Failed to send Telegram message: HTTP {response.status}{detail}")
+
+        try:
+            result = json.loads(response.data)
+        except ValueError as e:
+            raise Exception(f"Failed to send Telegram message: invalid response ({e})") from e
+
+        if not result.get("ok"):
+            raise Exception(f"Telegram API error: {result.get('description', 'Unknown error')}")
+
+        return result
+
+
+# Shared connection pool, created on first send so importing this module stays cheap
+_http = None
+_http_last_used = 0.0
+
+# Kept-alive connections idle longer than this are dropped before the next send.
+# Notifications are often hours apart, and by then Telegram has usually closed the
+# socket; a reset on a reused socket counts as a read error, which is never retried.
+_HTTP_MAX_IDLE_SECONDS = 30
+
+
+def _get_http():
+    """Return the shared urllib3 pool, creating it on first use and dropping stale sockets."""
+    global _http
+    if _http is not None and time.monotonic() - _http_last_used > _HTTP_MAX_IDLE_SECONDS:
+        _http.clear()
+    if _http is None:
+        import urllib3
+        from urllib3.util.retry import Retry
+
+        # One pooled connection so repeated sends skip the TCP+TLS handshake.
+        # sendMessage is not idempotent: only retry when the request never reached
+        # Telegram (connect errors) or was rejected (429/5xx), never after a read
+        # timeout, which would deliver the same message again.
+        retry = Retry(
+            total=2,
+            connect=2,
+            read=0,
+            status=1,
+            backoff_factor=0.2,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=frozenset(["POST"]),
+        )
+        # Per-attempt timeouts: at worst two full attempts plus one connect timeout
+        # (~15 s with backoff), inside the 20 s Lambda timeout
+        timeout = urllib3.Timeout(connect=2, read=4)
+        _http = urllib3.PoolManager(num_pools=1, maxsize=1, retries=retry, timeout=timeout)
+    return _http
+
+
+def _mark_http_used() -> None:
+    """Record that the shared pool's connection was just used."""
+    global _http_last_used
+    _http_last_used = time.monotonic()
+
+
+# Shared notifier, reused across warm Lambda invocations
+_notifier: Optional[TelegramNotifier] = None
+
 
-            result = response.json()
-            if not result.get("ok"):
-                raise Exception(f"Telegram API error: {result.get('description', 'Unknown error')}")
+def get_notifier(bot_token: str, chat_id: str) -> TelegramNotifier:
+    """
+    Return a shared Telegram notifier, created on first use or when settings change.
 
-            return result
+    Args:
+        bot_token: Telegram bot token
+        chat_id: Telegram chat ID to send messages to
 
-        except requests.exceptions.RequestException as e:
-            raise Exception(f"Failed to send Telegram message: {str(e)}")
+    Returns:
+        TelegramNotifier
+    """
+    global _notifier
+    if _notifier is None or (_notifier.bot_token, _notifier.chat_id) != (bot_token, chat_id):
+        _notifier = TelegramNotifier(bot_token, chat_id)
+    return _notifier
@@ -3,9 +3,45 @@ DynamoDB state storage for power monitor.
 Persists debounce state across Lambda invocations.
 """
 
-import boto3
-from typing import Dict, Any
-from decimal import Decimal
+import struct
+import time
+from typing import Dict, Any, Optional
+
+
+# DebounceState fields and their Python types
+_FIELD_TYPES = {
+    "last_confirmed_online": bool,
+    "last_observed_online": bool,
+    "streak": int,
+    "last_change_ts_ns": int,
+    "last_message_ts_ns": int,
+    "pending_change_since_ns": int,
+    "first_observed_change_ts_ns": int,
+}
+
+# Timestamp fields (integer nanoseconds) and the float-seconds names older items used
+_TIMESTAMP_FIELDS = {
+    "last_change_ts_ns": "last_change_ts",
+    "last_message_ts_ns": "last_message_ts",
+    "pending_change_since_ns": "pending_change_since",
+    "first_observed_change_ts_ns": "first_observed_change_ts",
+}
+
+
+# Packed state layout (little-endian): format version, flags, streak, four timestamps.
+# Flags: bits 0-1 / 2-3 hold last_confirmed_online / last_observed_online as
+# (known << 1 | value); bits 4-7 mark which of _TIMESTAMP_FIELDS are set.
+# Version 2 stores timestamps as int64 nanoseconds; version 1 stored float seconds.
+_STATE_STRUCTS = {1: struct.Struct("<BBi4d"), 2: struct.Struct("<BBi4q")}
+_STATE_VERSION = 2
+
+
+def _seconds_to_ns(seconds: float) -> int:
+    """Convert a float-seconds timestamp from an older item to integer nanoseconds."""
+    # Whole seconds and the fraction are scaled separately: seconds * 1e9 alone would
+    # round at ~256ns granularity for present-day timestamps
+    whole = int(seconds)
+    return whole * 1_000_000_000 + round((seconds - whole) * 1_000_000_000)
 
 
 class StateStore:
@@ -13,6 +49,14 @@ class StateStore:
 
     STATE_PK = "state"
 
+    # Unchanged state is still re-written this often, as a safety net against lost writes
+    REFRESH_SECONDS = 3600
+
+    # A warm container trusts its own copy of the state for this long after its last
+    # DynamoDB read or write (a bit over one poll interval). The scheduled function
+    # normally runs in a single container at a time, so nobody else changes the item.
+    CACHE_TTL_SECONDS = 90
+
     def __init__(self, table_name: str):
         """
         Initialize state store.
@@ -20,23 +64,44 @@ class StateStore:
         Args:
             table_name: DynamoDB table name
         """
-        self.dynamodb = boto3.resource("dynamodb")
-        self.table = self.dynamodb.Table(table_name)
+        # Imported here so loading this module doesn't pull in boto3
+        import boto3
+
+        # Low-level client: much lighter to create than boto3.resource, and we only
+        # need get_item/put_item on a flat item
+        self.client = boto3.client("dynamodb")
+        self.table_name = table_name
+        # State as last read from / written to DynamoDB (None if unknown)
+        self._loaded: Optional[Dict[str, Any]] = None
+        # Monotonic time _loaded was last read from or written to DynamoDB
+        self._synced_at: float = 0.0
+        # Monotonic time of the last successful write
+        self._last_write: Optional[float] = None
 
     def load_state(self) -> Dict[str, Any]:
         """
-        Load state from DynamoDB.
+        Load state from DynamoDB, or from memory if it was synced within CACHE_TTL_SECONDS.
 
         Returns:
             State dictionary with default values if not found
         """
+        now = time.monotonic()
+        if self._loaded is not None and now - self._synced_at < self.CACHE_TTL_SECONDS:
+            return dict(self._loaded)
+
+        self._loaded = None
         try:
-            response = self.table.get_item(Key={"pk": self.STATE_PK})
+            response = self.client.get_item(
+                TableName=self.table_name, Key={"pk": {"S": self.STATE_PK}}
+            )
 
             if "Item" in response:
                 item = response["Item"]
                 # Convert DynamoDB types to Python types
-                return self._deserialize_item(item)
+                state = self._deserialize_item(item)
+                self._loaded = dict(state)
+                self._synced_at = now
+                return state
             else:
                 # Return default state if not found
                 return self._default_state()
@@ -45,54 +110,125 @@ class StateStore:
             # Return default state on error
             return self._default_state()
 
-    def save_state(self, state: Dict[str, Any]) -> None:
+    def save_state(self, state: Dict[str, Any]) -> bool:
         """
         Save state to DynamoDB.
 
+        The write is skipped when the state equals what was last loaded or saved,
+        unless REFRESH_SECONDS have passed since this store's last write.
+
         Args:
             state: State dictionary to persist
+
+        Returns:
+            True if the state was written, False if the write was skipped
         """
-        item = {"pk": self.STATE_PK, **state}
-        # Convert floats to Decimal for DynamoDB
-        item = self._serialize_item(item)
-        self.table.put_item(Item=item)
+        now = time.monotonic()
+        if (
+            state == self._loaded
+            and self._last_write is not None
+            and now - self._last_write < self.REFRESH_SECONDS
+        ):
+            return False
+
+        item = self._serialize_item(state)
+        self.client.put_item(TableName=self.table_name, Item=item)
+        self._loaded = dict(state)
+        self._synced_at = now
+        self._last_write = now
+        return True
 
     @staticmethod
     def _default_state() -> Dict[str, Any]:
         """Return default initial state."""
-        return {
-            "last_confirmed_online": None,
-            "last_observed_online": None,
-            "streak": 0,
-            "last_change_ts": None,
-            "last_message_ts": None,
-        }
+        state = dict.fromkeys(_FIELD_TYPES)
+        state["streak"] = 0
+        return state
+
+    @classmethod
+    def _serialize_item(cls, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert state to a DynamoDB item with the state packed in one binary attribute."""
+        return {"pk": {"S": cls.STATE_PK}, "s": {"B": cls._pack_state(state)}}
+
+    @classmethod
+    def _deserialize_item(cls, item: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert a DynamoDB item (packed or legacy per-attribute) to state."""
+        if "s" in item:
+            return cls._unpack_state(item["s"]["B"])
+
+        # Items written before state was packed store each field as its own attribute,
+        # with timestamps as float seconds under their pre-nanosecond names
+        state = cls._default_state()
+        for name in ("last_confirmed_online", "last_observed_online"):
+            value = item.get(name)
+            if value is not None and "NULL" not in value:
+                state[name] = value["BOOL"]
+        value = item.get("streak")
+        if value is not None and "NULL" not in value:
+            state["streak"] = int(value["N"])
+        for name, legacy_name in _TIMESTAMP_FIELDS.items():
+            value = item.get(legacy_name)
+            if value is not None and "NULL" not in value:
+                state[name] = _seconds_to_ns(float(value["N"]))
+        return state
 
     @staticmethod
-    def _serialize_item(item: Dict[str, Any]) -> Dict[str, Any]:
-        """Convert Python types to DynamoDB types."""
-        serialized = {}
-        for key, value in item.items():
-            if isinstance(value, float):
-                serialized[key] = Decimal(str(value))
-            elif isinstance(value, dict):
-                serialized[key] = StateStore._serialize_item(value)
-            else:
-                serialized[key] = value
-        return serialized
+    def _pack_state(state: Dict[str, Any]) -> bytes:
+        """Pack state into the current struct layout; keys outside _FIELD_TYPES are not stored."""
+        flags = 0
+        for shift, name in ((0, "last_confirmed_online"), (2, "last_observed_online")):
+            value = state.get(name)
+            if value is not None:
+                flags |= (0b10 | bool(value)) << shift
+
+        timestamps = []
+        for bit, name in enumerate(_TIMESTAMP_FIELDS, start=4):
+            value = state.get(name)
+            if value is not None:
+                flags |= 1 << bit
+            timestamps.append(value or 0)
+
+        return _STATE_STRUCTS[_STATE_VERSION].pack(
+            _STATE_VERSION, flags, state.get("streak") or 0, *timestamps
+        )
 
     @staticmethod
-    def _deserialize_item(item: Dict[str, Any]) -> Dict[str, Any]:
-        """Convert DynamoDB types to Python types."""
-        deserialized = {}
-        for key, value in item.items():
-            if key == "pk":
-                continue  # Skip partition key
-            elif isinstance(value, Decimal):
-                # Convert Decimal to int or float
-                deserialized[key] = int(value) if value % 1 == 0 else float(value)
-            elif isinstance(value, dict):
-                deserialized[key] = StateStore._deserialize_item(value)
-            else:
-                deserialized[key] = value
-        return deserialized
+    def _unpack_state(data: bytes) -> Dict[str, Any]:
+        """Unpack state written by _pack_state, including older format versions."""
+        layout = _STATE_STRUCTS.get(data[0]) if data else None
+        if layout is None:
+            raise ValueError(f"Unsupported state format version: {data[:1].hex() or 'empty'}")
+        version, flags, streak, *timestamps = layout.unpack(data)
+        if version == 1:
+            timestamps = [_seconds_to_ns(value) for value in timestamps]
+
+        state: Dict[str, Any] = {}
+        for shift, name in ((0, "last_confirmed_online"), (2, "last_observed_online")):
+            bits = (flags >> shift) & 0b11
+            state[name] = bool(bits & 1) if bits & 0b10 else None
+        state["streak"] = streak
+        for bit, (name, value) in enumerate(
+            zip(_TIMESTAMP_FIELDS, timestamps, strict=True), start=4
+        ):
+            state[name] = value if flags & (1 << bit) else None
+        return state
+
+
+# Shared store so the DynamoDB client and write bookkeeping survive across warm invocations
+_store: Optional[StateStore] = None
+
+
+def get_state_store(table_name: str) -> StateStore:
+    """
+    Return a shared StateStore, created on first use or when the table changes.
+
+    Args:
+        table_name: DynamoDB table name
+
+    Returns:
+        StateStore
+    """
+    global _store
+    if _store is None or _store.table_name != table_name:
+        _store = StateStore(table_name)
+    return _store
@@ -3,13 +3,16 @@ Tuya Cloud API client wrapper.
 Handles authentication and device status queries.
 """
 
-from typing import Dict, Any
-from tuya_connector import TuyaOpenAPI
+import time
+from typing import Dict, Any, Optional, Tuple
 
 
 class TuyaClient:
     """Wrapper around Tuya OpenAPI for simplified device queries."""
 
+    # Reconnect when the access token has less than this left (milliseconds)
+    TOKEN_EXPIRY_MARGIN_MS = 5 * 60 * 1000
+
     def __init__(self, endpoint: str, access_id: str, access_key: str):
         """
         Initialize Tuya client.
@@ -19,9 +22,22 @@ class TuyaClient:
             access_id: Tuya Access ID
             access_key: Tuya Access Key
         """
+        # Imported here so loading this module doesn't pull in the SDK (and requests)
+        from tuya_connector import TuyaOpenAPI
+
+        self.credentials: Tuple[str, str, str] = (endpoint, access_id, access_key)
         self.api = TuyaOpenAPI(endpoint, access_id, access_key)
         self.api.connect()
 
+    def ensure_connected(self) -> None:
+        """Reconnect if there is no access token or it is about to expire."""
+        now_ms = int(time.time() * 1000)
+        if (
+            not self.api.is_connect()
+            or self.api.token_info.expire_time - self.TOKEN_EXPIRY_MARGIN_MS <= now_ms
+        ):
+            self.api.connect()
+
     def get_device_online_status(self, device_id: str) -> bool:
         """
         Query device online status from Tuya Cloud.
@@ -73,3 +89,30 @@ class TuyaClient:
             raise Exception(f"Tuya API error: {error_code} - {error_msg}")
 
         return response.get("result", {})
+
+
+# Shared client so the HTTP session and access token survive across warm Lambda invocations
+_client: Optional[TuyaClient] = None
+
+
+def get_tuya_client(endpoint: str, access_id: str, access_key: str) -> TuyaClient:
+    """
+    Return a shared, connected Tuya client.
+
+    The client is created on first use (or when credentials change) and reused
+    afterwards; its access token is renewed only when it is close to expiry.
+
+    Args:
+        endpoint: Tuya API endpoint (e.g., https://openapi.tuyaeu.com)
+        access_id: Tuya Access ID
+        access_key: Tuya Access Key
+
+    Returns:
+        Connected TuyaClient
+    """
+    global _client
+    if _client is None or _client.credentials != (endpoint, access_id, access_key):
+        _client = TuyaClient(endpoint, access_id, access_key)
+    else:
+        _client.ensure_connected()
+    return _client
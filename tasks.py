@@ -202,17 +202,24 @@ def uninstall_hooks(ctx):
 
 
 @task
-def test(ctx):
-    """Run unit tests."""
+def test(ctx, plain=False):
+    """
+    Run unit tests (in parallel across CPU cores via pytest-xdist).
+
+    Examples:
+        invoke test          # Rewritten asserts with detailed failure diffs
+        invoke test --plain  # Plain asserts: faster, but failures show less detail
+    """
     print("🧪 Running unit tests...")
-    run_cmd(ctx, "pytest tests/ -v")
+    flags = " --assert=plain" if plain else ""
+    run_cmd(ctx, f"pytest tests/ -v -n auto --dist loadscope{flags}")
 
 
 @task
 def test_cov(ctx):
     """Run unit tests with coverage."""
     print("🧪 Running unit tests with coverage...")
-    run_cmd(ctx, "pytest tests/ -v --cov=src --cov-report=term-missing")
+    run_cmd(ctx, "pytest tests/ -v -n auto --dist loadscope --cov=src --cov-report=term-missing")
 
 
 @task
@@ -223,10 +230,17 @@ def test_tuya(ctx):
 
 
 @task
-def test_telegram(ctx):
-    """Test Telegram notification."""
+def test_telegram(ctx, separate=False):
+    """
+    Test Telegram notification.
+
+    Examples:
+        invoke test-telegram             # All message types in one message
+        invoke test-telegram --separate  # One message per type
+    """
     python = get_venv_python()
-    run_cmd(ctx, f"{python} scripts/test_local.py --test-telegram")
+    flags = " --separate-messages" if separate else ""
+    run_cmd(ctx, f"{python} scripts/test_local.py --test-telegram{flags}")
 
 
 @task
@@ -343,13 +357,30 @@ def check_state(ctx):
         hide=True,
         warn=True,
     )
+    item = None
     if result.ok and result.stdout.strip():
         import json
 
-        data = json.loads(result.stdout)
-        print(json.dumps(data, indent=2))
-    else:
+        item = json.loads(result.stdout).get("Item")
+    if not item:
         print("ℹ️  No state found (table may be empty or not exist yet)")
+        return
+
+    import base64
+    from datetime import UTC, datetime
+
+    from src.state_store import StateStore
+
+    # The state is packed into one binary attribute, which the CLI prints as base64
+    if "s" in item:
+        item = {**item, "s": {"B": base64.b64decode(item["s"]["B"])}}
+    state = StateStore._deserialize_item(item)
+    for name, value in state.items():
+        if name.endswith("_ns") and value is not None:
+            when = datetime.fromtimestamp(value / 1e9, tz=UTC).isoformat()
+            print(f"  {name}: {value} ({when})")
+        else:
+            print(f"  {name}: {value}")
 
 
 @task
@@ -0,0 +1,13 @@
+"""
+Shared fixtures for the unit tests.
+"""
+
+import pytest
+
+import src.logic as _logic
+
+
+@pytest.fixture(scope="session")
+def psc():
+    """Return process_state_change, imported once per session for the tape-folding tests."""
+    return _logic.process_state_change
@@ -0,0 +1,175 @@
+"""
+Unit tests for config file loading and caching.
+Run with: pytest tests/test_config_loader.py
+"""
+
+import os
+from unittest import mock
+
+import pytest
+
+import src.config_loader as config_loader
+from src.config_loader import load_yaml_config
+
+CONFIG_YAML = """\
+tuya:
+  endpoint: https://openapi.tuyaeu.com
+  access_id: id
+  access_key: key
+  device_id: {device_id}
+telegram:
+  bot_token: token
+  chat_id: "1"
+"""
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Start every test with an empty in-memory cache (as a fresh process would)."""
+    config_loader._YAML_CACHE.clear()
+    yield
+    config_loader._YAML_CACHE.clear()
+
+
+class TestYamlCache:
+    """Test suite for the in-memory parsed config cache."""
+
+    def test_unchanged_file_is_served_from_cache(self, tmp_path):
+        """Test that a second load of an unchanged file reads nothing from disk."""
+        config = tmp_path / "config.yaml"
+        config.write_text(CONFIG_YAML.format(device_id="DEV1"))
+        load_yaml_config(config)
+
+        with mock.patch.object(
+            config_loader, "_load_json_sidecar", wraps=config_loader._load_json_sidecar
+        ) as sidecar:
+            assert load_yaml_config(config)["tuya"]["device_id"] == "DEV1"
+            sidecar.assert_not_called()
+
+    def test_edited_file_is_reloaded(self, tmp_path):
+        """Test that a change in mtime or size invalidates the cached entry."""
+        config = tmp_path / "config.yaml"
+        config.write_text(CONFIG_YAML.format(device_id="DEV1"))
+        assert load_yaml_config(config)["tuya"]["device_id"] == "DEV1"
+
+        config.write_text(CONFIG_YAML.format(device_id="DEVICE2"))
+        assert load_yaml_config(config)["tuya"]["device_id"] == "DEVICE2"
+
+    def test_returned_dict_is_a_copy(self, tmp_path):
+        """Test that mutating a loaded config doesn't affect the next load."""
+        config = tmp_path / "config.yaml"
+        config.write_text(CONFIG_YAML.format(device_id="DEV1"))
+
+        cfg = load_yaml_config(config)
+        cfg["tuya"]["device_id"] = "MUTATED"
+        del cfg["telegram"]
+
+        again = load_yaml_config(config)
+        assert again["tuya"]["device_id"] == "DEV1"
+        assert again["telegram"]["chat_id"] == "1"
+
+
+class TestJsonSidecar:
+    """Test suite for the JSON sidecar cache next to config.yaml."""
+
+    def test_sidecar_written_and_used(self, tmp_path):
+        """Test that the sidecar is written on first load and served afterwards."""
+        config = tmp_path / "config.yaml"
+        config.write_text(CONFIG_YAML.format(device_id="DEV1"))
+
+        assert load_yaml_config(config)["tuya"]["device_id"] == "DEV1"
+        assert (tmp_path / "config.yaml.cache.json").exists()
+
+        config_loader._YAML_CACHE.clear()
+        assert load_yaml_config(config)["tuya"]["device_id"] == "DEV1"
+
+    def test_restored_older_config_invalidates_sidecar(self, tmp_path):
+        """Test that restoring an older config.yaml (old mtime kept) isn't served stale."""
+        config = tmp_path / "config.yaml"
+        config.write_text(CONFIG_YAML.format(device_id="OLDDEV"))
+        original = config.stat()
+        load_yaml_config(config)
+
+        # Edit, load (rewrites the sidecar), then restore the old file as cp -p would
+        config.write_text(CONFIG_YAML.format(device_id="NEWDEV"))
+        os.utime(config, ns=(original.st_atime_ns, original.st_mtime_ns + 10**9))
+        config_loader._YAML_CACHE.clear()
+        assert load_yaml_config(config)["tuya"]["device_id"] == "NEWDEV"
+
+        config.write_text(CONFIG_YAML.format(device_id="OLDDEV"))
+        os.utime(config, ns=(original.st_atime_ns, original.st_mtime_ns))
+        config_loader._YAML_CACHE.clear()
+        assert load_yaml_config(config)["tuya"]["device_id"] == "OLDDEV"
+
+
+class TestValidation:
+    """Test suite for required-key validation."""
+
+    @pytest.mark.parametrize(
+        "yaml_text",
+        [
+            "telegram:\n  bot_token: token\n  chat_id: '1'\n",
+            "tuya:\ntelegram:\n  bot_token: token\n  chat_id: '1'\n",
+            CONFIG_YAML.format(device_id="DEV1").replace(
+                "  endpoint: https://openapi.tuyaeu.com\n", ""
+            ),
+        ],
+        ids=["missing_section", "null_section", "missing_key"],
+    )
+    def test_missing_key_names_dotted_path(self, tmp_path, yaml_text):
+        """Test that a missing or null section is reported as the first missing key."""
+        config = tmp_path / "config.yaml"
+        config.write_text(yaml_text)
+
+        with pytest.raises(KeyError) as excinfo:
+            load_yaml_config(config)
+        assert excinfo.value.args == ("tuya.endpoint",)
+
+    def test_nested_missing_key(self, tmp_path):
+        """Test that keys in later sections are reported by their full path."""
+        config = tmp_path / "config.yaml"
+        config.write_text(CONFIG_YAML.format(device_id="DEV1").replace('  chat_id: "1"\n', ""))
+
+        with pytest.raises(KeyError) as excinfo:
+            load_yaml_config(config)
+        assert excinfo.value.args == ("telegram.chat_id",)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
+
+
+class TestUpdateIniSection:
+    """Test suite for writing the AWS CLI credentials/config files."""
+
+    def test_other_profiles_are_preserved(self, tmp_path):
+        """Test that only the target section changes and the file stays private."""
+        credentials = tmp_path / "credentials"
+        credentials.write_text("[work]\naws_access_key_id = WORK\n")
+        config_loader._update_ini_section(credentials, "default", {"aws_access_key_id": "NEW"})
+        text = credentials.read_text()
+        assert "[work]\naws_access_key_id = WORK" in text
+        assert "[default]\naws_access_key_id = NEW" in text
+        assert os.stat(credentials).st_mode & 0o777 == 0o600
+        assert list(tmp_path.iterdir()) == [credentials]
+
+    def test_failed_write_leaves_file_intact(self, tmp_path):
+        """Test that an error while writing keeps the original file and no temp file."""
+        credentials = tmp_path / "credentials"
+        credentials.write_text("[work]\naws_access_key_id = WORK\n")
+        with mock.patch.object(
+            config_loader.configparser.RawConfigParser, "write", side_effect=OSError("disk full")
+        ):
+            with pytest.raises(OSError):
+                config_loader._update_ini_section(credentials, "default", {"region": "x"})
+        assert credentials.read_text() == "[work]\naws_access_key_id = WORK\n"
+        assert list(tmp_path.iterdir()) == [credentials]
+
+    def test_duplicate_section_raises_value_error(self, tmp_path):
+        """Test that a file configparser can't read is reported and left untouched."""
+        original = "[default]\nregion = a\n[default]\nregion = b\n"
+        config = tmp_path / "config"
+        config.write_text(original)
+        with pytest.raises(ValueError, match="config"):
+            config_loader._update_ini_section(config, "default", {"region": "c"})
+        assert config.read_text() == original
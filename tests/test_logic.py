@@ -3,147 +3,326 @@ Unit tests for debouncing and state transition logic.
 Run with: pytest tests/test_logic.py
 """
 
+import dataclasses
+from itertools import accumulate, product
+from types import SimpleNamespace
+
+import numpy as np
 import pytest
-from src.logic import DebounceState, process_state_change
+from hypothesis import given
+from hypothesis import strategies as st
+
+import src.logic as logic_module
+from src.logic import (
+    ControlState,
+    DebounceState,
+    pack_state,
+    process_state_change,
+    process_state_changes_batch,
+    step,
+    transition_array,
+    transition_table,
+    unpack_state,
+)
+
+# Shared starting states; DebounceState is frozen, so tests derive variants with replace()
+_UNKNOWN = DebounceState.of()
+_ONLINE = DebounceState.of(last_confirmed_online=True, last_observed_online=True, streak=2)
+_OFFLINE = DebounceState.of(last_confirmed_online=False, last_observed_online=False, streak=2)
+
+# (name, initial state, tape of readings, threshold, then per-reading expectations)
+TAPE_CASES = [
+    ("initial", _UNKNOWN, [True, True], 2, [1, 2], [None, True], [False, False]),
+    ("online_to_offline", _ONLINE, [False, False], 2, [1, 2], [True, False], [False, True]),
+    ("offline_to_online", _OFFLINE, [True, True], 2, [1, 2], [False, True], [False, True]),
+    ("glitch", _ONLINE, [False, True, True], 2, [1, 1, 2], [True] * 3, [False] * 3),
+    ("threshold_3", _ONLINE, [False] * 3, 3, [1, 2, 3], [True, True, False], [False, False, True]),
+]
+
+
+def _fold(psc, initial, tape, threshold):
+    """Return the (state, should_notify) pair after each reading of a tape."""
+    steps = accumulate(
+        tape, lambda step, online: psc(step[0], online, threshold), initial=(initial, False)
+    )
+    return list(steps)[1:]
+
+
+def _reference_confirmed(initial, tape, threshold):
+    """
+    Oracle for the confirmed state after each reading, with no confirmation delay.
+
+    A reading becomes confirmed once the last `threshold` readings all equal it; the
+    initial streak counts as that many earlier readings of the observed state.
+    """
+    history = [initial.last_observed_online] * initial.streak + list(tape)
+    confirmed = initial.last_confirmed_online
+    for i in range(initial.streak, len(history)):
+        window = history[i - threshold + 1 : i + 1] if i + 1 >= threshold else []
+        if window and all(reading == history[i] for reading in window):
+            confirmed = history[i]
+        yield confirmed
 
 
 class TestDebounceLogic:
     """Test suite for debouncing logic."""
 
-    def test_initial_state_establishment(self):
-        """Test that initial state requires debounce_threshold readings."""
-        # Start with unknown state
-        state = DebounceState()
-
-        # First reading: online=True
-        new_state, should_notify = process_state_change(state, True, debounce_threshold=2)
-        assert new_state.last_observed_online is True
-        assert new_state.streak == 1
-        assert new_state.last_confirmed_online is None
-        assert should_notify is False
-
-        # Second reading: still True, should confirm
-        new_state, should_notify = process_state_change(new_state, True, debounce_threshold=2)
-        assert new_state.last_observed_online is True
-        assert new_state.streak == 2
-        assert new_state.last_confirmed_online is True
-        assert should_notify is False  # Don't notify on initial state
-
-    def test_state_change_requires_debounce(self):
-        """Test that state changes require consecutive readings."""
-        # Start with confirmed online state
-        state = DebounceState(last_confirmed_online=True, last_observed_online=True, streak=2)
-
-        # First offline reading
-        new_state, should_notify = process_state_change(state, False, debounce_threshold=2)
-        assert new_state.last_observed_online is False
-        assert new_state.streak == 1
-        assert new_state.last_confirmed_online is True  # Still confirmed online
-        assert should_notify is False
-
-        # Second offline reading, should confirm change
-        new_state, should_notify = process_state_change(new_state, False, debounce_threshold=2)
-        assert new_state.last_observed_online is False
-        assert new_state.streak == 2
-        assert new_state.last_confirmed_online is False  # Now confirmed offline
-        assert should_notify is True
-
-    def test_glitch_rejection(self):
-        """Test that transient glitches don't trigger state changes."""
-        # Start with confirmed online state
-        state = DebounceState(last_confirmed_online=True, last_observed_online=True, streak=2)
-
-        # Transient offline reading
-        new_state, should_notify = process_state_change(state, False, debounce_threshold=2)
-        assert new_state.streak == 1
-        assert new_state.last_confirmed_online is True
-        assert should_notify is False
-
-        # Back online (glitch rejected)
-        new_state, should_notify = process_state_change(new_state, True, debounce_threshold=2)
-        assert new_state.last_observed_online is True
-        assert new_state.streak == 1
-        assert new_state.last_confirmed_online is True
-        assert should_notify is False
+    @pytest.mark.parametrize(
+        "name,initial,tape,threshold,streaks,confirmed,notifies",
+        TAPE_CASES,
+        ids=[case[0] for case in TAPE_CASES],
+    )
+    def test_tape(self, psc, name, initial, tape, threshold, streaks, confirmed, notifies):
+        """Test each reading of a tape against the expected streak, state and notification."""
+        steps = _fold(psc, initial, tape, threshold)
+        for (state, should_notify), online, streak, expected, expected_notify in zip(
+            steps, tape, streaks, confirmed, notifies, strict=True
+        ):
+            assert (
+                state.last_observed_online,
+                state.streak,
+                state.last_confirmed_online,
+                should_notify,
+            ) == (online, streak, expected, expected_notify)
+            if should_notify:
+                assert isinstance(state.last_change_ts_ns, int)
+
+        # The vectorized entrypoint must agree on the same tape
+        batch_confirmed, batch_notify, _ = process_state_changes_batch(
+            np.array(tape), threshold, initial
+        )
+        assert batch_confirmed.tolist() == [-1 if c is None else int(c) for c in confirmed]
+        assert batch_notify.tolist() == notifies
+
+    @given(
+        tape=st.lists(st.booleans(), min_size=1, max_size=200),
+        threshold=st.integers(min_value=2, max_value=5),
+        initial=st.sampled_from([_UNKNOWN, _ONLINE, _OFFLINE]),
+    )
+    def test_fold_invariants(self, psc, tape, threshold, initial):
+        """Test the debounce invariants over arbitrary tapes of readings."""
+        state = initial
+        run = initial.streak
+        for online in tape:
+            prev = state
+            state, should_notify = psc(state, online, threshold)
+            run = run + 1 if online == prev.last_observed_online else 1
+
+            # Streak counts the current run of identical readings, capped at threshold + 1
+            assert state.streak == min(run, threshold + 1)
+            # Notify exactly when an already-known confirmed state flips
+            flipped = state.last_confirmed_online != prev.last_confirmed_online
+            assert should_notify == (flipped and prev.last_confirmed_online is not None)
+            # A run confirms its reading as soon as it reaches the threshold, never later
+            if flipped:
+                assert run == threshold
+            if run >= threshold:
+                assert state.last_confirmed_online is online
+
+    @given(
+        tape=st.lists(st.booleans(), min_size=1, max_size=200),
+        threshold=st.integers(min_value=1, max_value=6),
+        initial=st.sampled_from([_UNKNOWN, _ONLINE, _OFFLINE]),
+    )
+    def test_fold_matches_reference(self, psc, tape, threshold, initial):
+        """Test the fold against the closed-form window oracle, reading by reading."""
+        steps = _fold(psc, initial, tape, threshold)
+        assert [state.last_confirmed_online for state, _ in steps] == list(
+            _reference_confirmed(initial, tape, threshold)
+        )
 
-        # Confirm still online
-        new_state, should_notify = process_state_change(new_state, True, debounce_threshold=2)
-        assert new_state.streak == 2
-        assert new_state.last_confirmed_online is True
-        assert should_notify is False  # No change, so no notification
+    @given(
+        tape=st.lists(st.booleans(), min_size=1, max_size=200),
+        threshold=st.integers(min_value=2, max_value=5),
+        initial=st.sampled_from([_UNKNOWN, _ONLINE, _OFFLINE]),
+    )
+    def test_transition_table_matches_fold(self, psc, tape, threshold, initial):
+        """Test that stepping packed states through the table agrees with the dataclass fold."""
+        table = transition_table()
+        state = initial
+        packed = pack_state(
+            initial.last_confirmed_online, initial.last_observed_online, initial.streak
+        )
+        for online in tape:
+            state, should_notify = psc(state, online, threshold)
+            packed, packed_notify = table[packed, online, threshold]
+            assert unpack_state(packed) + (packed_notify,) == (
+                state.last_confirmed_online,
+                state.last_observed_online,
+                state.streak,
+                should_notify,
+            )
+
+    @pytest.mark.parametrize("threshold", [2, 3, 4, 5])
+    def test_transition_array_matches_table(self, threshold):
+        """Test that the dense ControlState-indexed array agrees with the packed table."""
+        array = transition_array(threshold)
+        for (packed, online, table_threshold), (new_packed, notify) in transition_table().items():
+            if table_threshold != threshold:
+                continue
+            confirmed, observed, streak = unpack_state(packed)
+            row = array[
+                ControlState.from_online(confirmed),
+                ControlState.from_online(observed),
+                streak,
+                int(online),
+            ]
+            new_confirmed, new_observed, new_streak = unpack_state(new_packed)
+            assert row.tolist() == [
+                ControlState.from_online(new_confirmed),
+                ControlState.from_online(new_observed),
+                new_streak,
+                notify,
+            ]
+
+    def test_step_calls_back_on_confirmed_changes(self):
+        """Test that step hands each notified state to on_change and nothing else."""
+        notifications = []
+        state = _ONLINE
+        for online in [False, False, False, True, False, True, True]:
+            state = step(state, online, 2, on_change=notifications.append)
+
+        assert [n.last_confirmed_online for n in notifications] == [False, True]
+        assert notifications[-1] is state
+        # The callback is optional
+        assert step(state, True, 2).streak == 3
 
     def test_streak_increments_correctly(self):
         """Test that streak increments with consecutive matching readings."""
-        state = DebounceState(last_confirmed_online=True, last_observed_online=True, streak=2)
+        state = _ONLINE
 
-        # Multiple consecutive matching readings
-        new_state, _ = process_state_change(state, True, debounce_threshold=2)
-        assert new_state.streak == 3
+        # Multiple consecutive matching readings; the second is capped at threshold + 1
+        new_state, should_notify = process_state_change(state, True, debounce_threshold=2)
+        assert (
+            new_state.last_observed_online,
+            new_state.streak,
+            new_state.last_confirmed_online,
+            should_notify,
+        ) == (True, 3, True, False)
 
-        new_state, _ = process_state_change(new_state, True, debounce_threshold=2)
-        assert new_state.streak == 3  # Capped at threshold + 1
+        new_state, should_notify = process_state_change(new_state, True, debounce_threshold=2)
+        assert (
+            new_state.last_observed_online,
+            new_state.streak,
+            new_state.last_confirmed_online,
+            should_notify,
+        ) == (True, 3, True, False)
 
     def test_streak_resets_on_observation_change(self):
         """Test that streak resets when observation changes."""
-        state = DebounceState(last_confirmed_online=True, last_observed_online=True, streak=5)
+        state = dataclasses.replace(_ONLINE, streak=5)
 
         # Different observation resets streak
         new_state, should_notify = process_state_change(state, False, debounce_threshold=2)
-        assert new_state.last_observed_online is False
-        assert new_state.streak == 1
-        assert should_notify is False
-
-    def test_online_to_offline_transition(self):
-        """Test complete online to offline transition."""
-        # Start confirmed online
-        state = DebounceState(last_confirmed_online=True, last_observed_online=True, streak=2)
-
-        # Poll 1: offline
-        state, notify = process_state_change(state, False, debounce_threshold=2)
-        assert notify is False
-        assert state.last_confirmed_online is True
-
-        # Poll 2: offline (confirmed)
-        state, notify = process_state_change(state, False, debounce_threshold=2)
-        assert notify is True
-        assert state.last_confirmed_online is False
-        assert state.last_change_ts is not None
-
-    def test_offline_to_online_transition(self):
-        """Test complete offline to online transition."""
-        # Start confirmed offline
-        state = DebounceState(last_confirmed_online=False, last_observed_online=False, streak=2)
-
-        # Poll 1: online
-        state, notify = process_state_change(state, True, debounce_threshold=2)
-        assert notify is False
-        assert state.last_confirmed_online is False
-
-        # Poll 2: online (confirmed)
-        state, notify = process_state_change(state, True, debounce_threshold=2)
-        assert notify is True
-        assert state.last_confirmed_online is True
-        assert state.last_change_ts is not None
-
-    def test_higher_debounce_threshold(self):
-        """Test with higher debounce threshold (N=3)."""
-        state = DebounceState(last_confirmed_online=True, last_observed_online=True, streak=2)
-
-        # Poll 1: offline
-        state, notify = process_state_change(state, False, debounce_threshold=3)
-        assert notify is False
-        assert state.streak == 1
-
-        # Poll 2: offline
-        state, notify = process_state_change(state, False, debounce_threshold=3)
-        assert notify is False
-        assert state.streak == 2
-
-        # Poll 3: offline (confirmed with N=3)
-        state, notify = process_state_change(state, False, debounce_threshold=3)
-        assert notify is True
-        assert state.streak == 3
-        assert state.last_confirmed_online is False
+        assert (new_state.last_observed_online, new_state.streak, should_notify) == (
+            False,
+            1,
+            False,
+        )
+
+    def test_confirmation_delay_defers_notification(self):
+        """Test that a debounced change waits for the confirmation delay before notifying."""
+        state, _ = process_state_change(_ONLINE, False, 2, confirmation_delay_seconds=60)
+        state, should_notify = process_state_change(state, False, 2, confirmation_delay_seconds=60)
+        assert (state.last_confirmed_online, should_notify) == (True, False)
+        assert state.pending_change_since_ns is not None
+
+        # Once the delay has elapsed, the next matching reading confirms the change
+        state = dataclasses.replace(
+            state, pending_change_since_ns=state.pending_change_since_ns - 61_000_000_000
+        )
+        state, should_notify = process_state_change(state, False, 2, confirmation_delay_seconds=60)
+        assert (state.last_confirmed_online, should_notify) == (False, True)
+        assert state.pending_change_since_ns is None
+
+    @pytest.mark.parametrize("threshold", [1, 2, 3, 5])
+    def test_batch_matches_step_by_step(self, psc, monkeypatch, threshold):
+        """Test that the batch entrypoint agrees with folding process_state_change."""
+        rng = np.random.default_rng(threshold)
+        # Mostly short runs and glitches (vectorized path), then long runs (run walking)
+        tapes = [
+            np.repeat(rng.random(60) < 0.5, rng.integers(1, 6, size=60)),
+            np.repeat(rng.random(20) < 0.5, rng.integers(30, 90, size=20)),
+        ]
+
+        for tape, initial in product(
+            tapes,
+            (
+                _UNKNOWN,
+                dataclasses.replace(_ONLINE, streak=7),
+                dataclasses.replace(_OFFLINE, last_observed_online=True, streak=1),
+            ),
+        ):
+            # The fold reads the clock once per reading; feed it the reading timestamps
+            timestamps_ns = 1_700_000_000_000_000_000 + 60_000_000_000 * np.arange(tape.size)
+            clock = SimpleNamespace(time_ns=iter(timestamps_ns.tolist()).__next__)
+            monkeypatch.setattr(logic_module, "time", clock)
+            steps = _fold(psc, initial, tape.tolist(), threshold)
+            monkeypatch.undo()
+
+            expected_confirmed = [
+                -1 if state.last_confirmed_online is None else int(state.last_confirmed_online)
+                for state, _ in steps
+            ]
+            expected_notify = [should_notify for _, should_notify in steps]
+            expected_change_ts_ns = [state.last_change_ts_ns or 0 for state, _ in steps]
+
+            confirmed, notify, change_ts_ns = process_state_changes_batch(
+                tape, threshold, initial, timestamps_ns
+            )
+            assert confirmed.tolist() == expected_confirmed
+            assert notify.tolist() == expected_notify
+            assert change_ts_ns.tolist() == expected_change_ts_ns
+
+            # A bytes tape of 0/1 readings gives the same result
+            confirmed, notify, _ = process_state_changes_batch(
+                tape.astype(np.uint8).tobytes(), threshold, initial
+            )
+            assert confirmed.tolist() == expected_confirmed
+            assert notify.tolist() == expected_notify
+
+    @given(
+        tape=st.lists(st.booleans(), min_size=1, max_size=200),
+        gaps=st.lists(st.integers(min_value=0, max_value=10**12), min_size=200, max_size=200),
+        threshold=st.integers(min_value=1, max_value=5),
+    )
+    def test_batch_change_timestamps_are_monotonic(self, tape, gaps, threshold):
+        """Test that change timestamps never go backwards and match the notifications."""
+        timestamps_ns = np.cumsum(gaps[: len(tape)], dtype=np.int64)
+        _, notify, change_ts_ns = process_state_changes_batch(
+            tape, threshold, _ONLINE, timestamps_ns
+        )
+        assert np.all(np.diff(change_ts_ns[change_ts_ns > 0]) >= 0)
+        assert np.array_equal(change_ts_ns[notify], timestamps_ns[notify])
+
+    @pytest.mark.parametrize("timestamps_ns", [[1, 2], [1, 2, 3, 4], [[1, 2, 3]]])
+    def test_batch_rejects_mismatched_timestamps(self, timestamps_ns):
+        """Test that timestamps must line up one-to-one with the readings."""
+        with pytest.raises(ValueError):
+            process_state_changes_batch([True, True, False], 2, _ONLINE, timestamps_ns)
+
+    def test_transition_array_is_read_only(self):
+        """Test that the cached array can't be modified by a caller."""
+        with pytest.raises(ValueError):
+            transition_array(2)[0, 0, 0, 0, 0] = 1
+
+    def test_state_is_immutable(self):
+        """Test that transitions return a new state and leave the input untouched."""
+        new_state, _ = process_state_change(_ONLINE, False, debounce_threshold=2)
+        assert new_state is not _ONLINE
+        assert _ONLINE == DebounceState(
+            last_confirmed_online=True, last_observed_online=True, streak=2
+        )
+
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            new_state.streak = 0
+
+    def test_of_interns_equal_states(self):
+        """Test that DebounceState.of shares one instance per distinct state."""
+        assert DebounceState.of(True, True, 2) is _ONLINE
+        assert DebounceState.of() is _UNKNOWN
+        assert DebounceState.of(True, True, 3) is not _ONLINE
+        assert _ONLINE == DebounceState(True, True, 2)
 
     def test_to_dict_serialization(self):
         """Test state serialization."""
@@ -151,15 +330,18 @@ class TestDebounceLogic:
             last_confirmed_online=True,
             last_observed_online=False,
             streak=1,
-            last_change_ts=1234567890.0,
-            last_message_ts=1234567890.0,
+            last_change_ts_ns=1_234_567_890_000_000_000,
+            last_message_ts_ns=1_234_567_890_000_000_000,
         )
 
         state_dict = state.to_dict()
         assert state_dict["last_confirmed_online"] is True
         assert state_dict["last_observed_online"] is False
         assert state_dict["streak"] == 1
-        assert state_dict["last_change_ts"] == 1234567890.0
+        assert state_dict["last_change_ts_ns"] == 1_234_567_890_000_000_000
+
+        # The hand-written serializer must stay in sync with the dataclass fields
+        assert state_dict == dataclasses.asdict(state)
 
 
 if __name__ == "__main__":
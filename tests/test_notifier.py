@@ -0,0 +1,103 @@
+"""
+Tests for the Telegram notifier's shared connection pool.
+"""
+
+import json
+import socket
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+import src.notifier as notifier_module
+from src.notifier import TelegramNotifier
+
+_OK_BODY = json.dumps({"ok": True, "result": {}}).encode()
+
+
+class _ResettingServer:
+    """HTTP server that answers one request per connection and drops the socket on reuse."""
+
+    def __init__(self):
+        self.sock = socket.create_server(("127.0.0.1", 0))
+        self.port = self.sock.getsockname()[1]
+        self.connections = 0
+        threading.Thread(target=self._serve, daemon=True).start()
+
+    def _serve(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            self.connections += 1
+            threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    def _handle(self, conn):
+        with conn:
+            request = b""
+            while b"\r\n\r\n" not in request:
+                request += conn.recv(65536)
+            head, _, body = request.partition(b"\r\n\r\n")
+            length = next(
+                int(line.split(b":")[1])
+                for line in head.split(b"\r\n")
+                if line.lower().startswith(b"content-length:")
+            )
+            while len(body) < length:
+                body += conn.recv(65536)
+            conn.sendall(
+                b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                b"Content-Length: %d\r\nConnection: keep-alive\r\n\r\n%s"
+                % (len(_OK_BODY), _OK_BODY)
+            )
+            # Like an idle-timed-out keep-alive: the next request on this socket gets no response
+            conn.recv(65536)
+
+    def close(self):
+        self.sock.close()
+
+
+@pytest.fixture
+def server():
+    """Run a local server that resets reused connections."""
+    server = _ResettingServer()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Replace the notifier module's monotonic clock with a controllable one."""
+    now = [1000.0]
+    monkeypatch.setattr(notifier_module, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+@pytest.fixture
+def notifier(server, monkeypatch):
+    """Return a notifier pointed at the local server with a fresh shared pool."""
+    monkeypatch.setattr(notifier_module, "_http", None)
+    monkeypatch.setattr(notifier_module, "_http_last_used", 0.0)
+    notifier = TelegramNotifier("token", "chat")
+    notifier.api_url = f"http://127.0.0.1:{server.port}/bottoken/sendMessage"
+    return notifier
+
+
+class TestConnectionPool:
+    """Test cases for reusing the pooled Telegram connection."""
+
+    def test_idle_connection_is_dropped_before_send(self, notifier, server, clock):
+        """Test that a send after a long idle gap opens a new connection."""
+        assert notifier.send_message("first")["ok"]
+        clock[0] += 3600
+        assert notifier.send_message("second")["ok"]
+        assert server.connections == 2
+
+    def test_recent_connection_is_reused(self, notifier, server, clock):
+        """Test that back-to-back sends share one connection."""
+        notifier.send_message("first")
+        clock[0] += 1
+        with pytest.raises(Exception, match="Failed to send Telegram message"):
+            notifier.send_message("second")
+        assert server.connections == 1
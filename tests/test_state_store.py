@@ -0,0 +1,195 @@
+"""
+Unit tests for DynamoDB state persistence.
+Run with: pytest tests/test_state_store.py
+"""
+
+from types import SimpleNamespace
+from unittest import mock
+
+import boto3
+import pytest
+from moto import mock_aws
+
+import src.state_store as state_store_module
+from src.state_store import _FIELD_TYPES, _STATE_STRUCTS, StateStore
+
+TABLE_NAME = "power-monitor-state"
+
+STATE = {
+    "last_confirmed_online": True,
+    "last_observed_online": False,
+    "streak": 1,
+    "last_change_ts_ns": 1_700_000_000_123_456_789,
+    "last_message_ts_ns": 0,
+    "pending_change_since_ns": None,
+    "first_observed_change_ts_ns": 1_700_000_060_000_000_000,
+}
+
+
+@pytest.fixture
+def store(monkeypatch):
+    """StateStore backed by a moto DynamoDB table."""
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "eu-central-1")
+    with mock_aws():
+        boto3.client("dynamodb").create_table(
+            TableName=TABLE_NAME,
+            BillingMode="PAY_PER_REQUEST",
+            AttributeDefinitions=[{"AttributeName": "pk", "AttributeType": "S"}],
+            KeySchema=[{"AttributeName": "pk", "KeyType": "HASH"}],
+        )
+        yield StateStore(TABLE_NAME)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable monotonic clock for the store's write and cache timing."""
+    now = SimpleNamespace(value=1000.0)
+    monkeypatch.setattr(state_store_module, "time", SimpleNamespace(monotonic=lambda: now.value))
+    return now
+
+
+class TestStateEncoding:
+    """Test suite for the packed state format and older item layouts."""
+
+    @pytest.mark.parametrize("confirmed", [None, False, True])
+    @pytest.mark.parametrize("observed", [None, False, True])
+    def test_pack_round_trip(self, confirmed, observed):
+        """Test that packing keeps tri-state bools and tells None from 0 timestamps."""
+        state = dict(STATE, last_confirmed_online=confirmed, last_observed_online=observed)
+        assert StateStore._unpack_state(StateStore._pack_state(state)) == state
+
+    def test_pack_ignores_unknown_keys(self):
+        """Test that keys outside the DebounceState fields are not persisted."""
+        packed = StateStore._pack_state(dict(STATE, notify_failed=True))
+        assert StateStore._unpack_state(packed) == STATE
+
+    def test_unpack_version_1(self):
+        """Test that float-second timestamps from format version 1 are read as ns."""
+        flags = 0b11 | 0b10 << 2 | 0b1001 << 4  # confirmed online, observed offline
+        data = _STATE_STRUCTS[1].pack(1, flags, 3, 1_700_000_000.25, 0.0, 0.0, 1_700_000_060.5)
+
+        assert StateStore._unpack_state(data) == {
+            "last_confirmed_online": True,
+            "last_observed_online": False,
+            "streak": 3,
+            "last_change_ts_ns": 1_700_000_000_250_000_000,
+            "last_message_ts_ns": None,
+            "pending_change_since_ns": None,
+            "first_observed_change_ts_ns": 1_700_000_060_500_000_000,
+        }
+
+    def test_unpack_unsupported_version(self):
+        """Test that an unknown format version is rejected."""
+        data = bytes([99]) + StateStore._pack_state(STATE)[1:]
+        with pytest.raises(ValueError, match="Unsupported state format version"):
+            StateStore._unpack_state(data)
+
+    def test_deserialize_legacy_item(self):
+        """Test that per-attribute items (float seconds, old names) are migrated."""
+        item = {
+            "pk": {"S": "state"},
+            "last_confirmed_online": {"BOOL": False},
+            "last_observed_online": {"NULL": True},
+            "streak": {"N": "2"},
+            "last_change_ts": {"N": "1700000000.5"},
+            "last_message_ts": {"NULL": True},
+            "first_observed_change_ts": {"N": "1700000060"},
+            "notify_failed": {"BOOL": True},
+        }
+
+        state = StateStore._deserialize_item(item)
+        assert state == {
+            "last_confirmed_online": False,
+            "last_observed_online": None,
+            "streak": 2,
+            "last_change_ts_ns": 1_700_000_000_500_000_000,
+            "last_message_ts_ns": None,
+            "pending_change_since_ns": None,
+            "first_observed_change_ts_ns": 1_700_000_060_000_000_000,
+        }
+        assert state.keys() == _FIELD_TYPES.keys()
+
+
+class TestStateStore:
+    """Test suite for reading and writing state in DynamoDB."""
+
+    def test_load_missing_item_returns_default(self, store):
+        """Test that an empty table yields the default state."""
+        assert store.load_state() == StateStore._default_state()
+
+    def test_save_and_load_round_trip(self, store):
+        """Test that saved state reads back unchanged, from DynamoDB and not memory."""
+        assert store.save_state(STATE) is True
+
+        fresh = StateStore(TABLE_NAME)
+        assert fresh.load_state() == STATE
+
+        item = store.client.get_item(TableName=TABLE_NAME, Key={"pk": {"S": "state"}})["Item"]
+        assert set(item) == {"pk", "s"}
+
+    def test_unchanged_state_skips_write(self, store, clock):
+        """Test that the first save writes and saving the same state again doesn't."""
+        with mock.patch.object(store.client, "put_item", wraps=store.client.put_item) as put:
+            assert store.save_state(STATE) is True
+            clock.value += 60
+            assert store.save_state(dict(STATE)) is False
+            assert put.call_count == 1
+
+            # A changed state is written straight away
+            assert store.save_state(dict(STATE, streak=2)) is True
+            assert put.call_count == 2
+
+    def test_unchanged_state_after_load_is_written_once(self, store, clock):
+        """Test that a fresh store writes once even if the state matches what it loaded."""
+        StateStore(TABLE_NAME).save_state(STATE)
+        loaded = store.load_state()
+
+        with mock.patch.object(store.client, "put_item", wraps=store.client.put_item) as put:
+            assert store.save_state(loaded) is True
+            assert store.save_state(loaded) is False
+            assert put.call_count == 1
+
+    def test_unchanged_state_is_refreshed_hourly(self, store, clock):
+        """Test that unchanged state is re-written once REFRESH_SECONDS have passed."""
+        store.save_state(STATE)
+
+        with mock.patch.object(store.client, "put_item", wraps=store.client.put_item) as put:
+            clock.value += StateStore.REFRESH_SECONDS - 1
+            assert store.save_state(STATE) is False
+            clock.value += 1
+            assert store.save_state(STATE) is True
+            assert put.call_count == 1
+
+    def test_load_is_served_from_memory_within_ttl(self, store, clock):
+        """Test that a warm store reuses its copy until CACHE_TTL_SECONDS have passed."""
+        StateStore(TABLE_NAME).save_state(STATE)
+
+        with mock.patch.object(store.client, "get_item", wraps=store.client.get_item) as get:
+            assert store.load_state() == STATE
+            clock.value += StateStore.CACHE_TTL_SECONDS - 1
+            cached = store.load_state()
+            assert cached == STATE
+            assert get.call_count == 1
+
+            # Callers get a copy, so mutating it doesn't leak into the cache
+            cached["streak"] = 99
+            assert store.load_state() == STATE
+
+            clock.value += 1
+            assert store.load_state() == STATE
+            assert get.call_count == 2
+
+    def test_save_refreshes_the_read_cache(self, store, clock):
+        """Test that a write counts as a sync, so the next load skips DynamoDB."""
+        store.save_state(STATE)
+
+        with mock.patch.object(store.client, "get_item", wraps=store.client.get_item) as get:
+            clock.value += StateStore.CACHE_TTL_SECONDS - 1
+            assert store.load_state() == STATE
+            assert get.call_count == 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])